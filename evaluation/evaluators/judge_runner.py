@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from tqdm import tqdm
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket limiting how many requests are sent per second.
+
+    Tokens are refilled continuously at `rate` per second, up to `capacity` tokens,
+    so bursts of at most `capacity` requests are allowed after idle periods.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initializes the TokenBucket instance.
+
+        Args:
+            rate (float): Number of tokens refilled per second.
+            capacity (float, optional): Maximum number of stored tokens. Defaults to `max(1, rate)`.
+        """
+        if rate <= 0:
+            raise ValueError("`rate` should be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        if self.capacity < 1:
+            raise ValueError("`capacity` should be at least 1.")
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available, then consumes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                # Time until the next token is refilled
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class JudgeResult:
+    """
+    The outcome of judging one sample.
+
+    Attributes:
+        response (Any): The judge response (parsed JSON or raw string), None if every attempt failed.
+        error (str, optional): The error of the last failed attempt, None on success.
+        attempts (int): Number of judge calls made for the sample.
+    """
+    response: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+class JudgeRunner:
+    """
+    Drives an LLM-as-judge evaluator (e.g., `LLMasJudgeRawSQL` or `LLMasJudgeExecMatch`) over many samples
+    with a bounded number of concurrent calls, token-bucket rate limiting and retries with exponential backoff.
+
+    The judge is any callable accepting the sample fields as keyword arguments, so a local stub
+    can stand in for the LLM endpoint. Results are returned in the order of the input samples.
+    """
+
+    def __init__(
+        self,
+        judge: Callable[..., Any],
+        max_concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        retry_exceptions: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        """
+        Initializes the JudgeRunner instance.
+
+        Args:
+            judge (callable): The judge called as `judge(**sample)`.
+            max_concurrency (int): Maximum number of judge calls in flight.
+            requests_per_second (float, optional): Rate limit of judge calls (including retries), unlimited if None.
+            burst (float, optional): Token bucket capacity, i.e. the largest burst of calls. Defaults to `max(1, requests_per_second)`.
+            max_retries (int): Number of retries of a sample after its first failed call.
+            initial_backoff (float): Seconds to wait before the first retry, doubled for each further retry.
+            max_backoff (float): Upper bound of the wait between retries, in seconds.
+            retry_exceptions (tuple): Exception types which are retried; any other exception fails the sample at once.
+        """
+        if max_concurrency <= 0:
+            raise ValueError("`max_concurrency` should be positive.")
+        if max_retries < 0:
+            raise ValueError("`max_retries` should be non-negative.")
+        self.judge = judge
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.retry_exceptions = retry_exceptions
+
+    def _backoff(self, retry: int) -> float:
+        # Exponential backoff with full jitter, spreading out retries of concurrent calls
+        return random.uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** retry))
+
+    def judge_one(self, sample: Dict[str, Any]) -> JudgeResult:
+        """
+        Judges one sample, retrying failed calls with backoff.
+
+        Args:
+            sample (dict): Keyword arguments of the judge (e.g., `question`, `gold_sql`, `pred_sql`).
+
+        Returns:
+            JudgeResult: The response, or the last error once the retries are exhausted.
+        """
+        result = JudgeResult()
+        for retry in range(self.max_retries + 1):
+            if retry > 0:
+                time.sleep(self._backoff(retry - 1))
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            result.attempts += 1
+            try:
+                result.response = self.judge(**sample)
+                result.error = None
+                return result
+            except self.retry_exceptions as ex:
+                result.error = f"{type(ex).__name__}: {ex}"
+            except Exception as ex:
+                result.error = f"{type(ex).__name__}: {ex}"
+                return result
+        return result
+
+    def run(self, samples: Iterable[Dict[str, Any]], show_progress: bool = True) -> List[JudgeResult]:
+        """
+        Judges all samples concurrently.
+
+        Args:
+            samples (iterable of dict): Keyword arguments of the judge for each sample,
+                e.g. `df[["question", "gold_sql", "pred_sql"]].to_dict("records")`.
+            show_progress (bool): Whether to display a progress bar.
+
+        Returns:
+            list of JudgeResult: One result per sample, in the order of `samples`.
+        """
+        samples = list(samples)
+        results: List[Optional[JudgeResult]] = [None] * len(samples)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {executor.submit(self.judge_one, sample): idx for idx, sample in enumerate(samples)}
+            for future in tqdm(as_completed(futures), total=len(futures), ncols=100, colour="cyan", disable=not show_progress):
+                results[futures[future]] = future.result()
+        return results
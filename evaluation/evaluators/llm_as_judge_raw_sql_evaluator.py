@@ -2,7 +2,6 @@ import os
 import json
 import sys
 import pandas as pd
-from promptflow.client import load_flow
 from tqdm import tqdm
 
 
@@ -15,13 +14,22 @@ class LLMasJudgeRawSQL:
     The evaluation logic is defined in a `llm_as_judge_raw_sql.prompty` file.
     """
 
-    def __init__(self, model_config):
+    def __init__(self, model_config=None, flow=None):
         """
         Initializes the LLMasJudgeRawSQL instance.
 
         Args:
             model_config (dict): Model configuration used to load the prompt flow.
+            flow (callable, optional): A flow used instead of loading the prompt flow,
+                e.g. a local stub standing in for the LLM endpoint.
         """
+        if flow is not None:
+            self._flow = flow
+            return
+
+        # Imported only when the prompt flow is actually loaded
+        from promptflow.client import load_flow
+
         # Construct absolute path to the .prompty file defining the evaluation prompt
         prompty_path = os.path.abspath(
             os.path.join(os.path.dirname(__file__), "prompts/llm_as_judge_raw_sql.prompty")
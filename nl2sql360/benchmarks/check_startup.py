@@ -0,0 +1,74 @@
+r"""
+Startup checks of the lazy imports: `nl2sql360-cli help` / `version` and `from nl2sql360.core import Core`
+should not import the heavy modules only needed by evaluation (sqlglot, nltk, the evaluators, ...).
+
+Run with `python -m pytest benchmarks/check_startup.py` or `python benchmarks/check_startup.py` from the `nl2sql360` directory.
+"""
+import os
+import sys
+import subprocess
+from typing import Set
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# not needed to print the usage or the version
+CLI_HEAVY_MODULES = [
+    "sqlglot", "sqlparse", "pandas", "numpy", "sqlalchemy", "nltk", "psycopg2", "pymysql",
+    "nl2sql360.arguments", "nl2sql360.core", "nl2sql360.database", "nl2sql360.evaluator", "nl2sql360.parser", "nl2sql360.dataset"
+]
+
+# not needed to construct `Core` and query reports
+CORE_HEAVY_MODULES = [
+    "sqlglot", "sqlparse", "nltk", "psycopg2", "pymysql",
+    "nl2sql360.evaluator", "nl2sql360.parser", "nl2sql360.dataset"
+]
+
+
+def imported_modules(code: str) -> Set[str]:
+    r"""
+    Modules imported by running `code` in a fresh interpreter, from the `-X importtime` report.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
+    )
+    modules = set()
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[-1].strip())
+    return modules
+
+
+def assert_not_imported(modules: Set[str], heavy_modules) -> None:
+    imported = sorted(
+        heavy for heavy in heavy_modules
+        if any(module == heavy or module.startswith(heavy + ".") for module in modules)
+    )
+    assert not imported, "Unexpected imports at startup: {}".format(", ".join(imported))
+
+
+def test_cli_help():
+    assert_not_imported(
+        imported_modules("import sys; sys.argv = ['nl2sql360-cli', 'help']; from nl2sql360.cli import main; main()"),
+        CLI_HEAVY_MODULES
+    )
+
+
+def test_cli_version():
+    assert_not_imported(
+        imported_modules("import sys; sys.argv = ['nl2sql360-cli', 'version']; from nl2sql360.cli import main; main()"),
+        CLI_HEAVY_MODULES
+    )
+
+
+def test_core_import():
+    assert_not_imported(imported_modules("from nl2sql360.core import Core"), CORE_HEAVY_MODULES)
+
+
+if __name__ == "__main__":
+    test_cli_help()
+    test_cli_version()
+    test_core_import()
+    print("OK")
@@ -0,0 +1,49 @@
+r"""
+Checks of the subset membership masks: a scenario without any filter selects every sample, as `WHERE 1 = 1`,
+in both the bitmap store and the columnar engine.
+
+Run with `python -m pytest benchmarks/check_subset_membership.py` or `python benchmarks/check_subset_membership.py` from the `nl2sql360` directory.
+"""
+import os
+import sys
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from nl2sql360.database import SubsetMembership, SubsetMembershipStore
+from nl2sql360.filter import Scenario, compile_scenario
+
+
+def create_demo_engine():
+    engine = create_engine("sqlite://")
+    SubsetMembership.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE DATASET_demo (id INTEGER PRIMARY KEY, count_join INTEGER)"))
+        conn.execute(text("INSERT INTO DATASET_demo (id, count_join) VALUES (0, 0), (1, 2), (3, NULL)"))
+    return engine
+
+
+def test_intersection_without_conditions():
+    store = SubsetMembershipStore(create_demo_engine(), "demo")
+    mask = store.get_intersection_mask([])
+    assert mask.tolist() == store.get_mask("1 = 1").tolist() == [True, True, False, True]
+
+
+def test_intersection_with_conditions():
+    store = SubsetMembershipStore(create_demo_engine(), "demo")
+    assert store.get_intersection_mask(["count_join > 0"]).tolist() == [False, True, False, False]
+    assert store.get_intersection_mask(["count_join >= 0", "count_join < 1"]).tolist() == [True, False, False, False]
+
+
+def test_scenario_without_filters():
+    features = {"count_join": np.array([0, 2, np.nan])}
+    assert compile_scenario(Scenario(name="All", filters=[]), features).tolist() == [True, True, True]
+
+
+if __name__ == "__main__":
+    test_intersection_without_conditions()
+    test_intersection_with_conditions()
+    test_scenario_without_filters()
+    print("OK")
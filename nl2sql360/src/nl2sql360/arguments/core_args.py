@@ -24,6 +24,24 @@ class CoreArguments:
         metadata={"help": "Specify SQL dialect (e.g., sqlite) to parse."}
     )
     
+    query_engine: str = field(
+        default="sqlite",
+        metadata={"help": "The engine answering performance queries, `sqlite` (SQL on the core database) or `columnar` (NumPy arrays loaded in memory once)."}
+    )
+    
+    enable_results_table: bool = field(
+        default=False,
+        metadata={"help": "Maintain a long-format table of all evaluation results, which leaderboards are queried from."}
+    )
+    
+    enable_subset_membership: bool = field(
+        default=False,
+        metadata={"help": "Store filter subsets as membership bitmaps, which evaluation reports are aggregated with in memory."}
+    )
+    
     def __post_init__(self):
         if self.sql_dialect not in ["SQLite", "MySQL", "PostgreSQL"]:
             raise ValueError("`sql_dialect` must be one of `SQLite`, `MySQL` and `PostgreSQL`.")
+        
+        if self.query_engine not in ["sqlite", "columnar"]:
+            raise ValueError("`query_engine` must be one of `sqlite` and `columnar`.")
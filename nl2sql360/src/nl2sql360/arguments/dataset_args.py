@@ -18,7 +18,7 @@ class DatasetArguments:
     )
     
     samples_file: str = field(
-        metadata={"help": "The json file containing dataset samples."}
+        metadata={"help": "The json (or jsonl) file containing dataset samples."}
     )
     
     database_dir: str = field(
@@ -54,11 +54,27 @@ class DatasetArguments:
         default=None,
         metadata={"help": "The json file containing database domain classifications."}
     )
-    
+
+    num_processes: int = field(
+        default=8,
+        metadata={"help": "The number of multi-processes used to parse gold SQLs."}
+    )
+
+    parse_chunk_size: int = field(
+        default=1000,
+        metadata={"help": "The number of gold SQLs parsed per task of a process, also the number of samples inserted per batch."}
+    )
+
     def __post_init__(self):
+        if self.num_processes <= 0:
+            raise ValueError("`num_processes` should be positive.")
+
+        if self.parse_chunk_size <= 0:
+            raise ValueError("`parse_chunk_size` should be positive.")
+
         samples_file_path = Path(self.dataset_dir, self.samples_file)
-        if not samples_file_path.exists() or not samples_file_path.is_file() or samples_file_path.suffix != ".json":
-            raise ValueError("`samples_file` dose not exist or is not a valid json file.")
+        if not samples_file_path.exists() or not samples_file_path.is_file() or samples_file_path.suffix not in (".json", ".jsonl"):
+            raise ValueError("`samples_file` dose not exist or is not a valid json / jsonl file.")
         
         if self.tables_file:
             tables_file_path = Path(self.dataset_dir, self.tables_file)
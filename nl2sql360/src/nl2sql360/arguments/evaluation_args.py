@@ -30,6 +30,16 @@ class EvaluationArguments:
         metadata={"help": "Enable official spider evaluator."}
     )
     
+    spider_plug_value: bool = field(
+        default=False,
+        metadata={"help": "Whether to plug gold values into the predicted sqls in the official spider evaluator, for models not predicting values."}
+    )
+    
+    plug_value_budget: int = field(
+        default=1000,
+        metadata={"help": "The maximum number of value-plugged candidates executed per sample with `spider_plug_value`."}
+    )
+    
     num_processes: int = field(
         default=8,
         metadata={"help": "The number of multi-processes used in the evaluation "}
@@ -40,6 +50,61 @@ class EvaluationArguments:
         metadata={"help": "The timeout of SQL execution."}
     )
     
+    eval_chunk_size: int = field(
+        default=1000,
+        metadata={"help": "The number of samples evaluated and written into the evaluation table at a time."}
+    )
+    
+    resume: bool = field(
+        default=False,
+        metadata={"help": "Whether to resume an existing evaluation, skipping samples which already have all requested metrics."}
+    )
+    
+    reuse_gold_results: bool = field(
+        default=True,
+        metadata={"help": "Whether to store gold SQL execution results in NL2SQL360-core and reuse them in later evaluations (SQLite only)."}
+    )
+    
+    ves_adaptive: bool = field(
+        default=False,
+        metadata={"help": "Whether to stop timing a sample for `ves` / `rves` once the confidence interval of its time ratio is tight enough."}
+    )
+    
+    ves_min_iterations: int = field(
+        default=10,
+        metadata={"help": "The minimum number of timing iterations per sample for `ves` / `rves` in adaptive mode."}
+    )
+    
+    ves_max_iterations: int = field(
+        default=100,
+        metadata={"help": "The (maximum, in adaptive mode) number of timing iterations per sample for `ves` / `rves`."}
+    )
+    
+    ves_target_rel_error: float = field(
+        default=0.05,
+        metadata={"help": "The target relative half-width of the 95% confidence interval of the time ratio in adaptive mode."}
+    )
+    
+    ves_timing_statistic: str = field(
+        default="median",
+        metadata={"help": "The statistic (`median` or `mean`) aggregating the per-iteration time ratios for `ves` / `rves`, `mean` is the official 3-sigma-trimmed mean."}
+    )
+    
+    ves_warmup: int = field(
+        default=1,
+        metadata={"help": "The number of untimed warm-up executions of each SQL before timing for `ves` / `rves`."}
+    )
+    
+    ves_interleave: bool = field(
+        default=True,
+        metadata={"help": "Whether to interleave predicted and gold SQL executions with alternating order when timing for `ves` / `rves`."}
+    )
+    
+    ves_pin_cpu: bool = field(
+        default=False,
+        metadata={"help": "Whether to pin each evaluation process to its own CPU when timing for `ves` / `rves` (Linux only)."}
+    )
+    
     # for bird mini-dev MySQL / PostgreSQL database
         
     db_host: str = field(
@@ -47,8 +112,8 @@ class EvaluationArguments:
         metadata={"help": "The db host (`localhost` by default) for BIRD Mini-Dev dataset to connect MySQL or PostgreSQL database. "}
     )
     
-    db_port: str = field(
-        default="localhost",
+    db_port: Optional[int] = field(
+        default=None,
         metadata={"help": "The db port (`3306` for MySQL, `5432` for PostgreSQL by default) for BIRD Mini-Dev dataset to connect MySQL or PostgreSQL database. "}
     )
     
@@ -63,7 +128,7 @@ class EvaluationArguments:
     )
     
     db_password: str = field(
-        default="localhost",
+        default="password",
         metadata={"help": "The db password (`password` by default) for BIRD Mini-Dev dataset to connect MySQL or PostgreSQL database. "}
     )
     
@@ -78,4 +143,25 @@ class EvaluationArguments:
         
         if self.timeout <= 0:
             raise ValueError("`timeout` should be positive.")
+        
+        if self.plug_value_budget <= 0:
+            raise ValueError("`plug_value_budget` should be positive.")
+        
+        if self.eval_chunk_size <= 0:
+            raise ValueError("`eval_chunk_size` should be positive.")
+        
+        if self.ves_max_iterations <= 0:
+            raise ValueError("`ves_max_iterations` should be positive.")
+        
+        if self.ves_adaptive and not 2 <= self.ves_min_iterations <= self.ves_max_iterations:
+            raise ValueError("`ves_min_iterations` should be in [2, `ves_max_iterations`].")
+        
+        if self.ves_target_rel_error <= 0:
+            raise ValueError("`ves_target_rel_error` should be positive.")
+        
+        if self.ves_timing_statistic not in ["median", "mean"]:
+            raise ValueError("`ves_timing_statistic` only supports `median` or `mean`.")
+        
+        if self.ves_warmup < 0:
+            raise ValueError("`ves_warmup` should be non-negative.")
 
@@ -39,7 +39,36 @@ class ReportArguments:
         metadata={"help": "The scenario expressions (list) used to filter subset performance."}
     )
     
+    bootstrap_resamples: int = field(
+        default=0,
+        metadata={"help": "The number of bootstrap resamples used to report confidence intervals of metrics, 0 to disable."}
+    )
+    
+    confidence_level: float = field(
+        default=0.95,
+        metadata={"help": "The confidence level of the bootstrap confidence intervals."}
+    )
+    
+    bootstrap_seed: Optional[int] = field(
+        default=None,
+        metadata={"help": "The random seed of bootstrap resampling, for reproducible confidence intervals."}
+    )
+    
+    significance_baseline: Optional[str] = field(
+        default=None,
+        metadata={"help": "The baseline evaluation which the reported evaluations are compared to with paired bootstrap p-values."}
+    )
+    
     def __post_init__(self):
+        if self.bootstrap_resamples < 0:
+            raise ValueError("`bootstrap_resamples` should be non-negative.")
+        
+        if not 0 < self.confidence_level < 1:
+            raise ValueError("`confidence_level` should be in (0, 1).")
+        
+        if self.significance_baseline and self.bootstrap_resamples == 0:
+            raise ValueError("`significance_baseline` requires `bootstrap_resamples` to be positive.")
+        
         if isinstance(self.metric, str):
             self.metric = [m.strip() for m in self.metric.split(",")]
         
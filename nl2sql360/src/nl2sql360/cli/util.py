@@ -1,39 +1,46 @@
-from ..arguments import (
-    get_dataset_import_args,
-    get_evaluation_args,
-    get_report_args,
-    get_delete_history_args
-)
-from ..core import Core
-import pandas as pd
-from loguru import logger
 from pathlib import Path
 
 
+# Arguments and `Core` (pulling pandas, SQLAlchemy, sqlglot and the evaluators) are imported by each subcommand,
+# keeping `nl2sql360-cli version` / `help` fast.
+
 def run_dataset_import():
+    from ..arguments import get_dataset_import_args
+    from ..core import Core
     core_args, dataset_args = get_dataset_import_args()
     Core(core_args).import_dataset(dataset_args)
 
 
 def run_evaluation():
+    from ..arguments import get_evaluation_args
+    from ..core import Core
     core_args, evaluation_args = get_evaluation_args()
     Core(core_args).evaluate(evaluation_args)
 
 
 def run_report():
+    from loguru import logger
+    from ..arguments import get_report_args
+    from ..core import Core
     core_args, report_args = get_report_args()
     report = Core(core_args).generate_evaluation_report(
         dataset_name=report_args.report_dataset,
         filters=report_args.filter,
         scenarios=report_args.scenario,
         metrics=report_args.metric,
-        eval_names=report_args.report_evaluation
+        eval_names=report_args.report_evaluation,
+        bootstrap_resamples=report_args.bootstrap_resamples,
+        confidence_level=report_args.confidence_level,
+        bootstrap_seed=report_args.bootstrap_seed,
+        significance_baseline=report_args.significance_baseline
     )
     report.to_csv(report_args.save_path)
     logger.success(f"Save report in path `{Path(report_args.save_path).resolve()}` successfully.`")
 
 
 def run_delete_history():
+    from ..arguments import get_delete_history_args
+    from ..core import Core
     core_args, delete_history_args = get_delete_history_args()
     core = Core(core_args)
     if delete_history_args.dataset_name and not delete_history_args.eval_name:
@@ -1,6 +1,8 @@
 from .core import Core
+from .columnar import ColumnarEngine
 
 
 __all__ = [
-    "Core"
+    "Core",
+    "ColumnarEngine"
 ]
\ No newline at end of file
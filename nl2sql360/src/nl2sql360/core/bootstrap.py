@@ -0,0 +1,62 @@
+from typing import Optional, Tuple
+import warnings
+import numpy as np
+
+
+# resamples drawn per block, bounding the memory of the index matrix to `block_size` x #samples
+BOOTSTRAP_BLOCK_SIZE = 1000
+
+
+def bootstrap_means(values: np.ndarray, num_resamples: int = 10000, seed: Optional[int] = None, block_size: int = BOOTSTRAP_BLOCK_SIZE) -> np.ndarray:
+    r"""
+    Bootstrap distribution of the means (in percent) of each column of `values` (#samples x #columns, NaN for NULL).
+
+    All columns are resampled with the same sample indices, such that columns of different evaluations
+    on the same samples give paired resamples. NULLs are ignored as `AVG` does.
+    Returns an array of shape (num_resamples, #columns), NaN for resamples without any value of a column.
+    """
+    values = np.asarray(values, dtype=float)
+    not_null = ~np.isnan(values)
+    # samples without any value never contribute to the means
+    kept = not_null.any(axis=1)
+    values, not_null = np.where(not_null, values, 0.0)[kept], not_null[kept].astype(float)
+    num_samples, num_columns = values.shape
+    means = np.full((num_resamples, num_columns), np.nan)
+    if num_samples == 0:
+        return means
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, num_resamples, block_size):
+        size = min(block_size, num_resamples - start)
+        indices = rng.integers(0, num_samples, size=(size, num_samples))
+        # how many times each sample is drawn in each resample, shared by all columns
+        offsets = (np.arange(size) * num_samples)[:, None]
+        counts = np.bincount((indices + offsets).ravel(), minlength=size * num_samples).reshape(size, num_samples).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[start: start + size] = (counts @ values) / (counts @ not_null) * 100
+    return means
+
+
+def bootstrap_ci(means: np.ndarray, confidence_level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    r"""
+    Percentile confidence interval (low, high) of each column of a bootstrap distribution.
+    """
+    alpha = 1 - confidence_level
+    with warnings.catch_warnings():
+        # columns without any value (e.g., an empty subset) give NaN bounds
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanpercentile(means, [alpha / 2 * 100, (1 - alpha / 2) * 100], axis=0)
+    return low, high
+
+
+def paired_bootstrap_pvalue(means: np.ndarray, baseline_means: np.ndarray) -> np.ndarray:
+    r"""
+    Two-sided p-value of each column differing from the same column of the baseline, from paired bootstrap distributions.
+    """
+    diffs = means - baseline_means
+    valid = ~np.isnan(diffs)
+    num_valid = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        not_greater = ((diffs <= 0) & valid).sum(axis=0) / num_valid
+        not_less = ((diffs >= 0) & valid).sum(axis=0) / num_valid
+    return np.minimum(1.0, 2 * np.minimum(not_greater, not_less))
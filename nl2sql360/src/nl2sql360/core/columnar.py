@@ -0,0 +1,167 @@
+from typing import Dict, List, Optional, Tuple, Union
+from sqlalchemy import Engine
+import numpy as np
+
+from ..database import MetaDataset, METRIC_COL_MAPPING
+from ..filter import Filter, Scenario, compile_filter, compile_scenario
+
+
+_FEATURE_COLS = [name for name in vars(MetaDataset).keys() if name.startswith("count_")]
+_METRIC_COLS = [metric_col for metric_col in METRIC_COL_MAPPING.values() if metric_col is not None]
+
+
+def _fetch_array(db_engine: "Engine", statement: str, num_cols: int) -> np.ndarray:
+    # fetched as plain tuples through the DBAPI cursor, NULLs becoming NaNs
+    with db_engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        cursor.execute(statement)
+        records = cursor.fetchall()
+        cursor.close()
+    return np.array(records, dtype=float).reshape(-1, num_cols)
+
+
+class _ColumnarEvaluation:
+    r"""
+    Metric columns of an evaluation, restricted to the samples of the dataset and aligned with the dataset rows by `rows`.
+    """
+
+    def __init__(self, rows: np.ndarray, metrics: Dict[str, np.ndarray]) -> None:
+        self.rows = rows
+        self.metrics = metrics
+
+
+class ColumnarEngine:
+    r"""
+    In-memory columnar query engine of a dataset, answering performance queries with NumPy instead of SQL.
+
+    The SQL features of `DATASET_<name>` are loaded once, and the metric columns of each evaluation on first use.
+    Filters and scenarios are compiled into boolean masks over the dataset rows, with the semantics of the SQL queries
+    (inner join on sample id, NULL metrics ignored, NULL features never matching).
+    """
+
+    def __init__(self, db_engine: "Engine", dataset_name: str) -> None:
+        self.db_engine = db_engine
+        self.dataset_name = dataset_name
+        records = _fetch_array(
+            db_engine,
+            f"SELECT id, {', '.join(_FEATURE_COLS)} FROM DATASET_{dataset_name} ORDER BY id;",
+            len(_FEATURE_COLS) + 1
+        )
+        self.ids = records[:, 0].astype(np.int64)
+        self.features = {feature_col: records[:, i + 1] for i, feature_col in enumerate(_FEATURE_COLS)}
+        self._gold_codes = None
+        self._evaluations: Dict[str, _ColumnarEvaluation] = dict()
+        self._masks: Dict[str, np.ndarray] = dict()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def gold_codes(self) -> np.ndarray:
+        r"""
+        Code of the gold SQL of each dataset row, codes following the sorted order of distinct gold SQLs.
+        """
+        if self._gold_codes is None:
+            with self.db_engine.connect() as connection:
+                cursor = connection.connection.cursor()
+                cursor.execute(f"SELECT gold FROM DATASET_{self.dataset_name} ORDER BY id;")
+                golds = [record[0] for record in cursor.fetchall()]
+                cursor.close()
+            self._gold_codes = np.unique(np.array(golds, dtype=object), return_inverse=True)[1].reshape(-1)
+        return self._gold_codes
+
+    def get_evaluation(self, eval_name: str) -> "_ColumnarEvaluation":
+        if eval_name not in self._evaluations:
+            records = _fetch_array(
+                self.db_engine,
+                f"SELECT id, {', '.join(_METRIC_COLS)} FROM DATASET_{self.dataset_name}_EVALUATION_{eval_name} ORDER BY id;",
+                len(_METRIC_COLS) + 1
+            )
+            eval_ids = records[:, 0].astype(np.int64)
+            # inner join with the dataset on sample id
+            rows = np.searchsorted(self.ids, eval_ids)
+            joined = rows < len(self.ids)
+            joined[joined] = self.ids[rows[joined]] == eval_ids[joined]
+            self._evaluations[eval_name] = _ColumnarEvaluation(
+                rows=rows[joined],
+                metrics={metric_col: records[joined, i + 1] for i, metric_col in enumerate(_METRIC_COLS)}
+            )
+        return self._evaluations[eval_name]
+
+    def invalidate(self, eval_name: Optional[str] = None) -> None:
+        r"""
+        Drop the loaded columns of an evaluation (or all evaluations), e.g. after it is updated or deleted.
+        """
+        if eval_name is None:
+            self._evaluations.clear()
+        else:
+            self._evaluations.pop(eval_name, None)
+
+    def get_mask(self, subset: Union[Filter, Scenario, None] = None) -> np.ndarray:
+        r"""
+        Boolean mask over the dataset rows of a filter or scenario, or of all rows if `subset` is None.
+        """
+        if subset is None:
+            return np.ones(len(self), dtype=bool)
+        key = repr(subset)
+        if key not in self._masks:
+            if isinstance(subset, Scenario):
+                self._masks[key] = compile_scenario(subset, self.features)
+            else:
+                self._masks[key] = compile_filter(subset, self.features)
+        return self._masks[key]
+
+    def query_performance(self, eval_name: str, metric: str, subset: Union[Filter, Scenario, None] = None) -> Optional[float]:
+        r"""
+        `AVG(metric) * 100` of an evaluation over a subset, None for an empty subset, as the SQL queries.
+        """
+        if metric == "qvt":
+            return self.query_qvt_performance(eval_name)
+        evaluation = self.get_evaluation(eval_name)
+        values = evaluation.metrics[METRIC_COL_MAPPING[metric]]
+        selected = self.get_mask(subset)[evaluation.rows] & ~np.isnan(values)
+        values = values[selected]
+        if len(values) == 0:
+            return None
+        # summed sequentially as `AVG` of SQLite
+        return float(np.cumsum(values)[-1] / len(values) * 100)
+
+    def get_metric_matrix(self, eval_name: str, metrics: List[str], subset: Union[Filter, Scenario, None] = None) -> np.ndarray:
+        r"""
+        Values of metrics (one column per metric) of an evaluation over the dataset rows of a subset,
+        NaN for NULL values and for samples not in the evaluation.
+        """
+        evaluation = self.get_evaluation(eval_name)
+        matrix = np.full((len(self), len(metrics)), np.nan)
+        for i, metric in enumerate(metrics):
+            matrix[evaluation.rows, i] = evaluation.metrics[METRIC_COL_MAPPING[metric]]
+        return matrix[self.get_mask(subset)]
+
+    def query_qvt_performance(self, eval_name: str) -> Optional[float]:
+        r"""
+        Average EX over gold SQLs with at least two samples (question variants) and at least one correct prediction.
+        """
+        evaluation = self.get_evaluation(eval_name)
+        values = evaluation.metrics[METRIC_COL_MAPPING["ex"]]
+        codes = self.gold_codes[evaluation.rows]
+        num_codes = int(codes.max()) + 1 if len(codes) else 0
+        not_null = ~np.isnan(values)
+        counts = np.bincount(codes, minlength=num_codes)
+        not_null_counts = np.bincount(codes[not_null], minlength=num_codes)
+        sums = np.bincount(codes[not_null], weights=values[not_null], minlength=num_codes)
+        kept = (counts >= 2) & (not_null_counts > 0) & (sums != 0)
+        if not kept.any():
+            return None
+        group_averages = sums[kept] / not_null_counts[kept]
+        return float(np.cumsum(group_averages)[-1] / len(group_averages) * 100)
+
+    def query_report_performance(self, eval_name: str, overall_metrics: List[str], subset_metrics: List[str], subsets: List[Union[Filter, Scenario]]) -> Dict[Tuple[Optional[str], str], Optional[float]]:
+        r"""
+        Overall performance and performance of each subset of an evaluation,
+        as the mapping returned by `Core._query_evaluation_report_performance`.
+        """
+        performance = {(None, metric): self.query_performance(eval_name, metric) for metric in overall_metrics}
+        for subset in subsets:
+            for metric in subset_metrics:
+                performance[(subset.name, metric)] = self.query_performance(eval_name, metric, subset)
+        return performance
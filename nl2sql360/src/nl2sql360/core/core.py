@@ -1,5 +1,4 @@
 from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.orm import Session
 from loguru import logger
 from tqdm import tqdm
 from pathlib import Path
@@ -8,13 +7,28 @@ from pathlib import Path
 from pandas import DataFrame
 import pandas as pd
 import itertools
+from functools import partial
+import os
+import numpy as np
 
 from ..database import *
-from ..parser import SQLParser
-from ..dataset import NL2SQLDataset
 from ..arguments import CoreArguments, DatasetArguments, EvaluationArguments
-from ..evaluator import BirdEXEvaluator, SpiderEXEMEvaluator, VesEvaluator, RVesEvaluator, F1Evaluator
 from ..filter import Filter, Scenario, serialize_filter, serialize_scenario
+from .columnar import ColumnarEngine
+from .bootstrap import bootstrap_means, bootstrap_ci, paired_bootstrap_pvalue
+
+
+# Evaluators that execute SQLs (sharing one `ExecutionCache`), by name as the evaluator package is imported on first evaluation
+EXECUTION_EVALUATORS = ("BirdEXEvaluator", "VesEvaluator", "RVesEvaluator", "F1Evaluator")
+
+
+def _get_execution_evaluators() -> Tuple[type, ...]:
+    from .. import evaluator
+    return tuple(getattr(evaluator, name) for name in EXECUTION_EVALUATORS)
+
+
+# Evaluation columns which may stay NULL for a finished sample
+OPTIONAL_EVALUATION_COLUMNS = ("exec_status", "ves_ci", "rves_ci", "ves_mad", "rves_mad")
 
 
 class _Core:
@@ -28,16 +42,47 @@ class _Core:
         self.engine = create_engine(f"sqlite:///{core_args.core_dir}/{core_args.core_name}.sqlite")
         self.insp = inspect(self.engine)
         Base.metadata.create_all(self.engine, checkfirst=True)  # `DatasetInfo` Table Initialize
-        self.models_dict = dict()
+        # models of existing tables are only created (and their tables migrated) on first access
+        self.models_dict = LazyModelDict()
+        self._columnar_engines = dict()
         for table_name in self.insp.get_table_names():
-            if table_name == "__DATASET_INFO__":
+            if table_name in ("__DATASET_INFO__", "__GOLD_RESULT__", "__EVALUATION_RESULT__", "__SUBSET_MEMBERSHIP__"):
                 continue
             if "_EVALUATION_" in table_name:
-                self.models_dict[table_name] = get_evaluation_model(*get_dataset_name_and_evaluation_name_from_table_name(table_name))
+                self.models_dict.set_factory(table_name, partial(self._load_evaluation_model, table_name))
             else:
-                self.models_dict[table_name] = get_dataset_model(get_dataset_name_from_table_name(table_name))
+                self.models_dict.set_factory(table_name, partial(self._load_dataset_model, table_name))
+        # (dataset, evaluation) pairs known to be copied into the results table, backfilled on first use
+        self._synced_evaluations = set()
                 
+    def _sync_results_table(self, dataset_name: str, eval_names: List[str]) -> None:
+        r"""
+        Backfill evaluations made before the results table was enabled, once per evaluation and core instance.
+        """
+        for eval_name in eval_names:
+            if (dataset_name, eval_name) in self._synced_evaluations:
+                continue
+            if not is_evaluation_synced(self.engine, dataset_name, eval_name):
+                sync_evaluation_results(self.engine, dataset_name, eval_name)
+            self._synced_evaluations.add((dataset_name, eval_name))
+    
+    def _load_dataset_model(self, table_name: str):
+        dataset_name = get_dataset_name_from_table_name(table_name)
+        dataset_model = get_dataset_model(dataset_name)
+        # datasets imported before feature indexes existed get them here
+        create_feature_indexes(self.engine, dataset_name)
+        return dataset_model
+    
+    def _load_evaluation_model(self, table_name: str):
+        evaluation_model = get_evaluation_model(*get_dataset_name_and_evaluation_name_from_table_name(table_name))
+        add_missing_columns(self.engine, evaluation_model)
+        return evaluation_model
+    
     def import_dataset(self, dataset_args: "DatasetArguments") -> None:
+        # imported on first use, as only importing datasets parses SQLs and reads sample files
+        from ..parser import SQLFeatures, iter_sql_features
+        from ..dataset import NL2SQLDataset
+        
         table_name = f"DATASET_{dataset_args.dataset_name}"
         if table_name in self.models_dict.keys():
             logger.warning(f"Dataset `{dataset_args.dataset_name}` has been already imported.")
@@ -49,38 +94,59 @@ class _Core:
         logger.success(f"Dataset table `{table_name}` creation completed.")
         
         dataset = NL2SQLDataset(dataset_args)
-        with Session(self.engine) as session:
-            # Insert dataset info
-            dataset_info_item = DatasetInfo(
-                dataset_name=dataset_args.dataset_name,
-                database_dir_path=str(Path(dataset_args.dataset_dir, dataset_args.database_dir).resolve()),
-                tables_json_path=str(Path(dataset_args.dataset_dir, dataset_args.tables_file).resolve()) if dataset_args.tables_file else None
-            )
-            session.add(dataset_info_item)
-            
-            # Insert dataset samples
-            for id, (nlq, gold, db_id, complexity, db_domain) in enumerate(tqdm(list(zip(
-                dataset.get_all_questions(),
-                dataset.get_all_sqls(),
-                dataset.get_all_db_ids(),
-                dataset.get_all_sql_complexity(),
-                dataset.get_all_database_domains()
-            )), desc="Import dataset")):
-                parsed_sql = SQLParser(gold, dialect=self.core_args.sql_dialect.lower())
-                table_item = self.models_dict[table_name](
+        # Insert dataset info
+        dataset_info_row = dict(
+            dataset_name=dataset_args.dataset_name,
+            database_dir_path=str(Path(dataset_args.dataset_dir, dataset_args.database_dir).resolve()),
+            tables_json_path=str(Path(dataset_args.dataset_dir, dataset_args.tables_file).resolve()) if dataset_args.tables_file else None
+        )
+        
+        # Insert dataset samples, parsing gold SQLs in a process pool while inserting parsed chunks
+        samples = list(zip(
+            dataset.get_all_questions(),
+            dataset.get_all_sqls(),
+            dataset.get_all_db_ids(),
+            dataset.get_all_sql_complexity(),
+            dataset.get_all_database_domains()
+        ))
+        sql_features_iter = iter_sql_features(
+            [gold for _, gold, _, _, _ in samples],
+            dialect=self.core_args.sql_dialect.lower(),
+            num_processes=dataset_args.num_processes,
+            chunk_size=dataset_args.parse_chunk_size
+        )
+        null_features = dict.fromkeys(SQLFeatures._fields)
+        failed_ids = []
+        with bulk_write(self.engine) as conn:
+            bulk_insert(conn, DatasetInfo, [dataset_info_row])
+            dataset_rows = []
+            for id, ((nlq, gold, db_id, complexity, db_domain), (sql_features, error)) in enumerate(tqdm(
+                zip(samples, sql_features_iter), total=len(samples), desc="Import dataset"
+            )):
+                if error is not None:
+                    failed_ids.append(id)
+                    logger.debug(f"Failed to parse gold SQL of sample {id}: {error}")
+                dataset_rows.append(dict(
                     id=id,
                     nlq=nlq,
                     gold=gold,
                     db_id=db_id,
                     complexity=complexity,
                     db_domain=db_domain,
-                    **{attr: getattr(parsed_sql, attr) for attr in dir(parsed_sql) if attr.startswith("count_")}
-                )
-                session.add(table_item)
-            session.commit()
+                    **(sql_features if sql_features is not None else null_features)
+                ))
+                if len(dataset_rows) >= dataset_args.parse_chunk_size:
+                    bulk_insert(conn, self.models_dict[table_name], dataset_rows)
+                    dataset_rows = []
+            bulk_insert(conn, self.models_dict[table_name], dataset_rows)
+        create_feature_indexes(self.engine, dataset_args.dataset_name)
+        if failed_ids:
+            logger.warning(f"Failed to parse the gold SQLs of {len(failed_ids)} samples, whose SQL features are stored as NULL: {failed_ids}.")
         logger.success(f"Import dataset `{dataset_args.dataset_name}` completed, {len(dataset)} samples in total.")
         
     def evaluate(self, evaluation_args: "EvaluationArguments") -> None:
+        from ..evaluator import BirdEXEvaluator, SpiderEXEMEvaluator, VesEvaluator, RVesEvaluator, F1Evaluator
+        
         dataset_table_name = f"DATASET_{evaluation_args.eval_dataset}"
         if dataset_table_name not in self.models_dict.keys():
             logger.warning(f"Dataset `{evaluation_args.eval_dataset}` has not been imported.")
@@ -88,13 +154,14 @@ class _Core:
         
         table_name = f"DATASET_{evaluation_args.eval_dataset}_EVALUATION_{evaluation_args.eval_name}"
         if table_name in self.models_dict.keys():
-            logger.warning(f"Evaluation `{evaluation_args.eval_name}` on dataset `{evaluation_args.eval_dataset}` has been existed.")
-            return
-        
-        evaluation_model = get_evaluation_model(evaluation_args.eval_dataset, evaluation_args.eval_name)
-        self.models_dict[evaluation_model.__tablename__] = evaluation_model
-        Base.metadata.create_all(self.engine, checkfirst=True)
-        logger.success(f"Evaluation table `{table_name}` creation completed.")
+            if not evaluation_args.resume:
+                logger.warning(f"Evaluation `{evaluation_args.eval_name}` on dataset `{evaluation_args.eval_dataset}` has been existed.")
+                return
+        else:
+            evaluation_model = get_evaluation_model(evaluation_args.eval_dataset, evaluation_args.eval_name)
+            self.models_dict[evaluation_model.__tablename__] = evaluation_model
+            Base.metadata.create_all(self.engine, checkfirst=True)
+            logger.success(f"Evaluation table `{table_name}` creation completed.")
         
         dataset_info = get_dataset_info(self.engine, evaluation_args.eval_dataset)
         if dataset_info is None:
@@ -107,7 +174,12 @@ class _Core:
                 eval_em = "em" in evaluation_args.eval_metrics and dataset_info.tables_json_path
                 if "em" in evaluation_args.eval_metrics and dataset_info.tables_json_path is None:
                     logger.warning(f"`EM` metric evaluation ignored, due to no imported `tables_file` for {evaluation_args.eval_dataset} dataset.")
-                evaluators.append(SpiderEXEMEvaluator(eval_em=eval_em, eval_ex=True))
+                evaluators.append(SpiderEXEMEvaluator(
+                    eval_em=eval_em,
+                    eval_ex=True,
+                    plug_value=evaluation_args.spider_plug_value,
+                    plug_value_budget=evaluation_args.plug_value_budget
+                ))
             else:
                 eval_em = "em" in evaluation_args.eval_metrics and dataset_info.tables_json_path
                 if "em" in evaluation_args.eval_metrics and dataset_info.tables_json_path is None:
@@ -116,11 +188,11 @@ class _Core:
                     evaluators.append(SpiderEXEMEvaluator(eval_em=eval_em, eval_ex=False))
                 evaluators.append(BirdEXEvaluator(
                     sql_dialect=self.core_args.sql_dialect,
-                    dbname=evaluation_args.db_name,
-                    user=evaluation_args.db_user,
-                    host=evaluation_args.db_host,
-                    password=evaluation_args.db_password,
-                    port=evaluation_args.db_port
+                    db_name=evaluation_args.db_name,
+                    db_user=evaluation_args.db_user,
+                    db_host=evaluation_args.db_host,
+                    db_password=evaluation_args.db_password,
+                    db_port=evaluation_args.db_port
                 ))
         elif "em" in evaluation_args.eval_metrics:
             if dataset_info.tables_json_path is None:
@@ -132,32 +204,46 @@ class _Core:
             evaluators.append(VesEvaluator(
                 reuse_ex=evaluation_args.enable_spider_eval,
                 sql_dialect=self.core_args.sql_dialect,
-                dbname=evaluation_args.db_name,
-                user=evaluation_args.db_user,
-                host=evaluation_args.db_host,
-                password=evaluation_args.db_password,
-                port=evaluation_args.db_port
+                db_name=evaluation_args.db_name,
+                db_user=evaluation_args.db_user,
+                db_host=evaluation_args.db_host,
+                db_password=evaluation_args.db_password,
+                db_port=evaluation_args.db_port,
+                iterate_num=evaluation_args.ves_max_iterations,
+                min_iterate_num=evaluation_args.ves_min_iterations,
+                target_rel_error=evaluation_args.ves_target_rel_error if evaluation_args.ves_adaptive else None,
+                timing_statistic=evaluation_args.ves_timing_statistic,
+                warmup=evaluation_args.ves_warmup,
+                interleave=evaluation_args.ves_interleave,
+                pin_cpu=evaluation_args.ves_pin_cpu
             ))
             
         if "rves" in evaluation_args.eval_metrics:
             evaluators.append(RVesEvaluator(
                 reuse_ex=evaluation_args.enable_spider_eval,
                 sql_dialect=self.core_args.sql_dialect,
-                dbname=evaluation_args.db_name,
-                user=evaluation_args.db_user,
-                host=evaluation_args.db_host,
-                password=evaluation_args.db_password,
-                port=evaluation_args.db_port
+                db_name=evaluation_args.db_name,
+                db_user=evaluation_args.db_user,
+                db_host=evaluation_args.db_host,
+                db_password=evaluation_args.db_password,
+                db_port=evaluation_args.db_port,
+                iterate_num=evaluation_args.ves_max_iterations,
+                min_iterate_num=evaluation_args.ves_min_iterations,
+                target_rel_error=evaluation_args.ves_target_rel_error if evaluation_args.ves_adaptive else None,
+                timing_statistic=evaluation_args.ves_timing_statistic,
+                warmup=evaluation_args.ves_warmup,
+                interleave=evaluation_args.ves_interleave,
+                pin_cpu=evaluation_args.ves_pin_cpu
             ))
         
         if "f1" in evaluation_args.eval_metrics:
             evaluators.append(F1Evaluator(
                 sql_dialect=self.core_args.sql_dialect,
-                dbname=evaluation_args.db_name,
-                user=evaluation_args.db_user,
-                host=evaluation_args.db_host,
-                password=evaluation_args.db_password,
-                port=evaluation_args.db_port
+                db_name=evaluation_args.db_name,
+                db_user=evaluation_args.db_user,
+                db_host=evaluation_args.db_host,
+                db_password=evaluation_args.db_password,
+                db_port=evaluation_args.db_port
             ))
 
         with open(evaluation_args.pred_sqls_file, "r", encoding="utf-8") as f:
@@ -167,8 +253,73 @@ class _Core:
         gold_sqls = [sample["gold"] for sample in dataset_samples]
         db_ids = [sample["db_id"] for sample in dataset_samples]
         
-        eval_results = dict()
-        eval_metrics = set()
+        eval_metrics = [metric for evaluator in evaluators for metric in evaluator.get_eval_metrics()]
+        if any(isinstance(evaluator, _get_execution_evaluators()) for evaluator in evaluators):
+            eval_metrics.append("exec_status")
+        sample_ids = list(range(len(pred_sqls)))
+        if evaluation_args.resume:
+            required_metrics = [metric for metric in eval_metrics if metric not in OPTIONAL_EVALUATION_COLUMNS]
+            finished_ids = get_finished_sample_ids(self.engine, self.models_dict[table_name], required_metrics)
+            sample_ids = [idx for idx in sample_ids if idx not in finished_ids]
+            logger.info(f"Resume evaluation, {len(pred_sqls) - len(sample_ids)} samples have been already evaluated.")
+        
+        if self.core_args.enable_results_table:
+            # rows evaluated before are copied first, as only the evaluated chunks are synced below
+            self._sync_results_table(evaluation_args.eval_dataset, [evaluation_args.eval_name])
+        
+        # Evaluate in chunks and write each chunk in one transaction, such that finished work survives interruption
+        for start in range(0, len(sample_ids), evaluation_args.eval_chunk_size):
+            chunk_ids = sample_ids[start: start + evaluation_args.eval_chunk_size]
+            eval_results = self._evaluate_chunk(
+                evaluators=evaluators,
+                evaluation_args=evaluation_args,
+                dataset_info=dataset_info,
+                gold_sqls=[gold_sqls[idx] for idx in chunk_ids],
+                pred_sqls=[pred_sqls[idx] for idx in chunk_ids],
+                db_ids=[db_ids[idx] for idx in chunk_ids]
+            )
+            upsert_evaluation_rows(self.engine, self.models_dict[table_name], [
+                {"id": idx, "pred": pred_sqls[idx], **{metric: eval_results[metric][i] for metric in eval_metrics}}
+                for i, idx in enumerate(chunk_ids)
+            ])
+            if self.core_args.enable_results_table and chunk_ids:
+                sync_evaluation_results(self.engine, evaluation_args.eval_dataset, evaluation_args.eval_name, (min(chunk_ids), max(chunk_ids)))
+            logger.info(f"Evaluated {start + len(chunk_ids)} / {len(sample_ids)} samples.")
+        if evaluation_args.eval_dataset in self._columnar_engines:
+            self._columnar_engines[evaluation_args.eval_dataset].invalidate(evaluation_args.eval_name)
+        logger.success(f"Evaluation `{evaluation_args.eval_name}` completed.")
+
+    def _evaluate_chunk(self, evaluators, evaluation_args, dataset_info, gold_sqls, pred_sqls, db_ids) -> Dict[str, List]:
+        from ..evaluator import SQLExecutor, ExecutionCache
+        # Execute each distinct (db, sql) pair once and share the results across execution-based metrics
+        exec_cache = None
+        if any(isinstance(evaluator, _get_execution_evaluators()) for evaluator in evaluators):
+            logger.info("Executing SQLs...")
+            exec_cache = SQLExecutor(
+                sql_dialect=self.core_args.sql_dialect,
+                db_name=evaluation_args.db_name,
+                db_user=evaluation_args.db_user,
+                db_host=evaluation_args.db_host,
+                db_password=evaluation_args.db_password,
+                db_port=evaluation_args.db_port
+            ).execute(
+                gold_sqls=gold_sqls,
+                pred_sqls=pred_sqls,
+                db_ids=db_ids,
+                db_dir=dataset_info.database_dir_path,
+                num_processes=evaluation_args.num_processes,
+                timeout=evaluation_args.timeout,
+                gold_store=GoldResultStore(self.engine) if evaluation_args.reuse_gold_results else None
+            )
+            logger.success(f"Executing SQLs completed, {len(exec_cache)} distinct SQLs in total.")
+            db_places = [os.path.join(dataset_info.database_dir_path, db_id, f"{db_id}.sqlite") for db_id in db_ids]
+            exec_status_list = [exec_cache.get(db_place, pred)[0] for pred, db_place in zip(pred_sqls, db_places)]
+            gold_timeouts = sum(exec_cache.get(db_place, gold)[0] == ExecutionCache.TIMEOUT for gold, db_place in zip(gold_sqls, db_places))
+            pred_timeouts = exec_status_list.count(ExecutionCache.TIMEOUT)
+            if pred_timeouts or gold_timeouts:
+                logger.warning(f"{pred_timeouts} predicted SQLs and {gold_timeouts} gold SQLs exceeded the timeout of {evaluation_args.timeout}s.")
+
+        eval_results = dict() if exec_cache is None else {"exec_status": exec_status_list}
         for evaluator in evaluators:
             logger.info(f"Evaluating {evaluator.get_eval_metrics()}...")
             exec_acc_list = eval_results.get("exec_acc", None)
@@ -178,29 +329,17 @@ class _Core:
                 db_ids=db_ids,
                 db_dir=dataset_info.database_dir_path,
                 tables_json_path=dataset_info.tables_json_path,
-                exec_acc_list=exec_acc_list
+                exec_acc_list=exec_acc_list,
+                exec_cache=exec_cache,
+                num_processes=evaluation_args.num_processes,
+                timeout=evaluation_args.timeout
             ))
             logger.success(f"Evaluating {evaluator.get_eval_metrics()} completed.")
-            eval_metrics.update(evaluator.get_eval_metrics())
-
-        insert_data = []
-        for idx, pred in enumerate(pred_sqls):
-            item = {
-                "id": idx,
-                "pred": pred
-            }
-            for metric in eval_metrics:
-                item[metric] = eval_results[metric][idx]
-            insert_data.append(item)
-        
-        with Session(self.engine) as session:
-            for data in tqdm(insert_data, desc="Intert into evaluation table"):
-                table_item = self.models_dict[table_name](
-                    **data
-                )
-                session.add(table_item)
-            session.commit()
-        logger.success(f"Evaluation `{evaluation_args.eval_name}` completed.")
+        if exec_cache is not None:
+            # samples whose rows failed to be compared are marked as errors by the evaluators above
+            eval_results["exec_status"] = [exec_cache.status(db_place, pred, gold)
+                                           for pred, gold, db_place in zip(pred_sqls, gold_sqls, db_places)]
+        return eval_results
 
 
 class Core(_Core):
@@ -222,6 +361,8 @@ class Core(_Core):
     
     def _check_dataset_valid(self, dataset_name: str) -> bool:
         if dataset_name in self.query_available_datasets()["Dataset"].values:
+            # loads the dataset model (and its feature indexes) once before it is queried
+            self.models_dict.get(f"DATASET_{dataset_name}")
             return True
         else:
             logger.warning(f"Cannot find `{dataset_name}` dataset in NL2SQL360.")
@@ -241,25 +382,36 @@ class Core(_Core):
             logger.warning(f"`{metric}` metric is not supported, available metrics: (`ex`, `em`, `ves`, `rves`, `f1`, `qvt`).")
             return False
     
+    def get_columnar_engine(self, dataset_name: str) -> "ColumnarEngine":
+        r"""
+        In-memory columnar engine of a dataset, loaded on first use and kept for later queries.
+        """
+        if dataset_name not in self._columnar_engines:
+            self._columnar_engines[dataset_name] = ColumnarEngine(self.engine, dataset_name)
+        return self._columnar_engines[dataset_name]
+    
     def query_overall_performance(self, dataset_name: str, metric: str, eval_name: str) -> DataFrame:
         if not (self._check_dataset_valid(dataset_name) and self._check_evaluation_valid(dataset_name, eval_name) and self._check_metric_valid(metric)):
             return None
         else:
-            if metric == "qvt":
-                statetment = QUERY_QVT_PERFORMANCE.format(
-                    DATASET_NAME=dataset_name,
-                    EVAL_NAME=eval_name
-                )
+            if self.core_args.query_engine == "columnar":
+                res = (self.get_columnar_engine(dataset_name).query_performance(eval_name, metric), )
             else:
-                statetment = QUERY_OVERALL_PERFORMANCE.format(
-                    DATASET_NAME=dataset_name,
-                    EVAL_NAME=eval_name,
-                    METRIC_COL=METRIC_COL_MAPPING[metric]
-                )
-            with self.engine.connect() as connection:
-                result = connection.execute(text(statetment))
-                connection.commit()
-            res = result.first()
+                if metric == "qvt":
+                    statetment = QUERY_QVT_PERFORMANCE.format(
+                        DATASET_NAME=dataset_name,
+                        EVAL_NAME=eval_name
+                    )
+                else:
+                    statetment = QUERY_OVERALL_PERFORMANCE.format(
+                        DATASET_NAME=dataset_name,
+                        EVAL_NAME=eval_name,
+                        METRIC_COL=METRIC_COL_MAPPING[metric]
+                    )
+                with self.engine.connect() as connection:
+                    result = connection.execute(text(statetment))
+                    connection.commit()
+                res = result.first()
             if res:
                 return DataFrame(data={"Evaluation": eval_name, metric.upper(): res}).round(decimals=2)
             else:
@@ -276,10 +428,22 @@ class Core(_Core):
                     return None
         else:
             eval_names = self.query_available_evaluations(dataset_name)["Evaluation"].values
-        dataframes = []
-        for eval_name in eval_names:
-            dataframes.append(self.query_overall_performance(dataset_name, metric, eval_name))
-        df = pd.concat(dataframes, ignore_index=True).sort_values(by=[metric.upper(), "Evaluation"], ascending=False)
+        if self.core_args.query_engine == "columnar" or self.core_args.enable_results_table:
+            if self.core_args.query_engine == "columnar":
+                columnar_engine = self.get_columnar_engine(dataset_name)
+                values = {eval_name: columnar_engine.query_performance(eval_name, metric) for eval_name in eval_names}
+            else:
+                performances = self._query_results_table_performance(dataset_name, eval_names, [metric], [], [])
+                values = {eval_name: performances[eval_name][(None, metric)] for eval_name in eval_names}
+            df = DataFrame([
+                {"Evaluation": eval_name, metric.upper(): values[eval_name]} for eval_name in eval_names
+            ]).round(decimals=2)
+        else:
+            dataframes = []
+            for eval_name in eval_names:
+                dataframes.append(self.query_overall_performance(dataset_name, metric, eval_name))
+            df = pd.concat(dataframes, ignore_index=True)
+        df = df.sort_values(by=[metric.upper(), "Evaluation"], ascending=False)
         df["Rank"] = df[f"{metric.upper()}"].rank(axis=0, method="dense", ascending=False)
         return df
 
@@ -291,16 +455,19 @@ class Core(_Core):
             logger.warning(f"QVT metric only supports overall performance.")
             return None
         
-        statetment = QUERY_SUBSET_PERFORMANCE.format(
-            DATASET_NAME=dataset_name,
-            EVAL_NAME=eval_name,
-            METRIC_COL=METRIC_COL_MAPPING[metric],
-            WHERE_CONDITION=serialize_filter(filter)
-        )
-        with self.engine.connect() as connection:
-            result = connection.execute(text(statetment))
-            connection.commit()
-        res = result.first()
+        if self.core_args.query_engine == "columnar":
+            res = (self.get_columnar_engine(dataset_name).query_performance(eval_name, metric, filter), )
+        else:
+            statetment = QUERY_SUBSET_PERFORMANCE.format(
+                DATASET_NAME=dataset_name,
+                EVAL_NAME=eval_name,
+                METRIC_COL=METRIC_COL_MAPPING[metric],
+                WHERE_CONDITION=serialize_filter(filter)
+            )
+            with self.engine.connect() as connection:
+                result = connection.execute(text(statetment))
+                connection.commit()
+            res = result.first()
         if res:
             return DataFrame(data={"Evaluation": eval_name, "Subset": filter.name, metric.upper(): res}).round(decimals=2)
         else:
@@ -317,10 +484,24 @@ class Core(_Core):
                     return None
         else:
             eval_names = self.query_available_evaluations(dataset_name)["Evaluation"].values
-        dataframes = []
-        for eval_name in eval_names:
-            dataframes.append(self.query_filter_performance(dataset_name, filter, metric, eval_name))
-        df = pd.concat(dataframes, ignore_index=True).sort_values(by=[metric.upper(), "Evaluation"], ascending=False, ignore_index=True)
+        if (self.core_args.query_engine == "columnar" or self.core_args.enable_results_table) and metric != "qvt":
+            if self.core_args.query_engine == "columnar":
+                columnar_engine = self.get_columnar_engine(dataset_name)
+                values = {eval_name: columnar_engine.query_performance(eval_name, metric, filter) for eval_name in eval_names}
+            else:
+                performances = self._query_results_table_performance(
+                    dataset_name, eval_names, [], [metric], [(filter.name, serialize_filter(filter))]
+                )
+                values = {eval_name: performances[eval_name][(filter.name, metric)] for eval_name in eval_names}
+            df = DataFrame([
+                {"Evaluation": eval_name, "Subset": filter.name, metric.upper(): values[eval_name]} for eval_name in eval_names
+            ]).round(decimals=2)
+        else:
+            dataframes = []
+            for eval_name in eval_names:
+                dataframes.append(self.query_filter_performance(dataset_name, filter, metric, eval_name))
+            df = pd.concat(dataframes, ignore_index=True)
+        df = df.sort_values(by=[metric.upper(), "Evaluation"], ascending=False, ignore_index=True)
         df["Rank"] = df[f"{metric.upper()}"].rank(axis=0, method="dense", ascending=False)
         return df
     
@@ -332,16 +513,19 @@ class Core(_Core):
             logger.warning(f"QVT metric only supports overall performance.")
             return None
         
-        statetment = QUERY_SUBSET_PERFORMANCE.format(
-            DATASET_NAME=dataset_name,
-            EVAL_NAME=eval_name,
-            METRIC_COL=METRIC_COL_MAPPING[metric],
-            WHERE_CONDITION=serialize_scenario(scenario)
-        )
-        with self.engine.connect() as connection:
-            result = connection.execute(text(statetment))
-            connection.commit()
-        res = result.first()
+        if self.core_args.query_engine == "columnar":
+            res = (self.get_columnar_engine(dataset_name).query_performance(eval_name, metric, scenario), )
+        else:
+            statetment = QUERY_SUBSET_PERFORMANCE.format(
+                DATASET_NAME=dataset_name,
+                EVAL_NAME=eval_name,
+                METRIC_COL=METRIC_COL_MAPPING[metric],
+                WHERE_CONDITION=serialize_scenario(scenario)
+            )
+            with self.engine.connect() as connection:
+                result = connection.execute(text(statetment))
+                connection.commit()
+            res = result.first()
         if res:
             return DataFrame(data={"Evaluation": eval_name, "Subset": scenario.name, metric.upper(): res}).round(decimals=2)
         else:
@@ -358,10 +542,24 @@ class Core(_Core):
                     return None
         else:
             eval_names = self.query_available_evaluations(dataset_name)["Evaluation"].values
-        dataframes = []
-        for eval_name in eval_names:
-            dataframes.append(self.query_scenario_performance(dataset_name, scenario, metric, eval_name))
-        df = pd.concat(dataframes, ignore_index=True).sort_values(by=[metric.upper(), "Evaluation"], ascending=False, ignore_index=True)
+        if (self.core_args.query_engine == "columnar" or self.core_args.enable_results_table) and metric != "qvt":
+            if self.core_args.query_engine == "columnar":
+                columnar_engine = self.get_columnar_engine(dataset_name)
+                values = {eval_name: columnar_engine.query_performance(eval_name, metric, scenario) for eval_name in eval_names}
+            else:
+                performances = self._query_results_table_performance(
+                    dataset_name, eval_names, [], [metric], [(scenario.name, serialize_scenario(scenario))]
+                )
+                values = {eval_name: performances[eval_name][(scenario.name, metric)] for eval_name in eval_names}
+            df = DataFrame([
+                {"Evaluation": eval_name, "Subset": scenario.name, metric.upper(): values[eval_name]} for eval_name in eval_names
+            ]).round(decimals=2)
+        else:
+            dataframes = []
+            for eval_name in eval_names:
+                dataframes.append(self.query_scenario_performance(dataset_name, scenario, metric, eval_name))
+            df = pd.concat(dataframes, ignore_index=True)
+        df = df.sort_values(by=[metric.upper(), "Evaluation"], ascending=False, ignore_index=True)
         df["Rank"] = df[f"{metric.upper()}"].rank(axis=0, method="dense", ascending=False)
         return df
     
@@ -433,12 +631,32 @@ class Core(_Core):
             df = DataFrame(data=db_domain_count)
             return df
     
-    def generate_evaluation_report(self, dataset_name: str, filters: List[Filter], scenarios: List[Scenario], metrics: List[str], eval_names: List[str] = None) -> DataFrame:
+    def generate_evaluation_report(
+        self,
+        dataset_name: str,
+        filters: List[Filter],
+        scenarios: List[Scenario],
+        metrics: List[str],
+        eval_names: List[str] = None,
+        bootstrap_resamples: int = 0,
+        confidence_level: float = 0.95,
+        bootstrap_seed: Optional[int] = None,
+        significance_baseline: Optional[str] = None
+    ) -> DataFrame:
+        r"""
+        Performance of evaluations, overall and on each filter / scenario.
+        
+        With `bootstrap_resamples > 0`, each metric (except `qvt`) also gets the bounds of its percentile bootstrap
+        confidence interval (`<METRIC> CI Low` / `<METRIC> CI High`), and with `significance_baseline` the two-sided
+        paired bootstrap p-value of its difference to the baseline evaluation (`<METRIC> P-Value`).
+        """
         if not self._check_dataset_valid(dataset_name):
             return None
         for metric in metrics:
             if not self._check_metric_valid(metric):
                 return None
+        if significance_baseline and not self._check_evaluation_valid(dataset_name, significance_baseline):
+            return None
             
         if eval_names:
             for eval_name in eval_names:
@@ -447,47 +665,210 @@ class Core(_Core):
         else:
             eval_names = self.query_available_evaluations(dataset_name)["Evaluation"].values
             
-        results = []
+        # `qvt` metric only supports overall performance
+        subset_metrics = [metric for metric in metrics if metric != "qvt"]
+        subsets = [(filter.name, serialize_filter(filter)) for filter in filters] + \
+            [(scenario.name, serialize_scenario(scenario)) for scenario in scenarios]
         
-        for eval_name in eval_names:
-            
-            # Overall performance
-            
-            data = {"Subset": "Overall"}
-            for metric in metrics:
-                df = self.query_overall_performance(dataset_name=dataset_name, metric=metric, eval_name=eval_name)
-                if df is not None:
-                    data.update(df.to_dict())
-            results.append(DataFrame(data))
-            
-            
-            # `qvt`` metric only supports `overall performance``
-            if "qvt" in metrics:
-                metrics.remove("qvt")
-            
-            # Filter Performance
-            
-            for filter in filters:
-                data = dict()
-                for metric in metrics:
-                    filter_df = self.query_filter_performance(dataset_name=dataset_name, filter=filter, metric=metric, eval_name=eval_name)
-                    if filter_df is not None:
-                        data.update(filter_df.to_dict())
-                results.append(DataFrame(data))
-                
-            # Scenario Performance
-            
-            for scenario in scenarios:
-                data = dict()
-                for metric in metrics:
-                    scenario_df = self.query_scenario_performance(dataset_name=dataset_name, scenario=scenario, metric=metric, eval_name=eval_name)
-                    if scenario_df is not None:
-                        data.update(scenario_df.to_dict())
-                results.append(DataFrame(data))
-        
-        df = pd.concat(results, ignore_index=True).sort_values(by=["Subset", "Evaluation"], ignore_index=True)
+        
+        if self.core_args.enable_subset_membership:
+            membership_store = SubsetMembershipStore(self.engine, dataset_name)
+            subset_conditions = [(filter.name, [serialize_filter(filter)]) for filter in filters] + \
+                [(scenario.name, [serialize_filter(filter) for filter in scenario.filters]) for scenario in scenarios]
+        
+        rows = []
+        for eval_idx, eval_name in enumerate(eval_names):
+            # `qvt` is only reported for the first evaluation, as the report always did
+            overall_metrics = metrics if eval_idx == 0 else subset_metrics
+            if self.core_args.query_engine == "columnar":
+                performance = self.get_columnar_engine(dataset_name).query_report_performance(
+                    eval_name, overall_metrics, subset_metrics, list(filters) + list(scenarios)
+                )
+            elif self.core_args.enable_subset_membership:
+                performance = self._query_membership_performance(
+                    membership_store, eval_name, overall_metrics, subset_metrics if subsets else [], subset_conditions
+                )
+            else:
+                performance = self._query_evaluation_report_performance(
+                    dataset_name, eval_name, overall_metrics, subset_metrics if subsets else [], subsets
+                )
+            rows.append({"Subset": "Overall", "Evaluation": eval_name, 
+                         **{metric.upper(): performance[(None, metric)] for metric in overall_metrics}})
+            if bootstrap_resamples > 0:
+                rows[-1].update(self._query_bootstrap_statistics(
+                    dataset_name, eval_name, subset_metrics, None, 
+                    bootstrap_resamples, confidence_level, bootstrap_seed, significance_baseline
+                ))
+            if not subset_metrics:
+                continue
+            for subset in list(filters) + list(scenarios):
+                rows.append({"Evaluation": eval_name, "Subset": subset.name, 
+                             **{metric.upper(): performance[(subset.name, metric)] for metric in subset_metrics}})
+                if bootstrap_resamples > 0:
+                    rows[-1].update(self._query_bootstrap_statistics(
+                        dataset_name, eval_name, subset_metrics, subset, 
+                        bootstrap_resamples, confidence_level, bootstrap_seed, significance_baseline
+                    ))
+        
+        # rounded per metric column, as every performance query does, keeping p-values more precise
+        df = DataFrame(rows)
+        decimals = {column: 4 if column.endswith(" P-Value") else 2 for column in df.columns}
+        df = df.round(decimals=decimals).sort_values(by=["Subset", "Evaluation"], ignore_index=True)
         return df
     
+    def _query_bootstrap_statistics(
+        self,
+        dataset_name: str,
+        eval_name: str,
+        metrics: List[str],
+        subset: Union[Filter, Scenario, None],
+        num_resamples: int,
+        confidence_level: float,
+        seed: Optional[int],
+        baseline: Optional[str]
+    ) -> Dict[str, Optional[float]]:
+        r"""
+        Bootstrap confidence interval (and paired bootstrap p-value against `baseline`) of each metric of an evaluation over a subset,
+        resampling the samples once for all metrics (and the baseline).
+        """
+        columnar_engine = self.get_columnar_engine(dataset_name)
+        values = columnar_engine.get_metric_matrix(eval_name, metrics, subset)
+        if baseline:
+            values = np.hstack([values, columnar_engine.get_metric_matrix(baseline, metrics, subset)])
+        means = bootstrap_means(values, num_resamples=num_resamples, seed=seed)
+        low, high = bootstrap_ci(means[:, :len(metrics)], confidence_level=confidence_level)
+        if baseline:
+            p_values = paired_bootstrap_pvalue(means[:, :len(metrics)], means[:, len(metrics):])
+        
+        statistics = dict()
+        for i, metric in enumerate(metrics):
+            statistics[f"{metric.upper()} CI Low"] = None if np.isnan(low[i]) else float(low[i])
+            statistics[f"{metric.upper()} CI High"] = None if np.isnan(high[i]) else float(high[i])
+            if baseline:
+                statistics[f"{metric.upper()} P-Value"] = None if np.isnan(p_values[i]) else float(p_values[i])
+        return statistics
+    
+    def _query_evaluation_report_performance(self, dataset_name: str, eval_name: str, overall_metrics: List[str], subset_metrics: List[str], subsets: List[Tuple[str, str]]) -> Dict[Tuple[Optional[str], str], Optional[float]]:
+        r"""
+        Overall performance and performance of each subset `(name, where condition)` of an evaluation, in a single query.
+        
+        Returns a mapping from `(subset name, metric)` to the performance, with subset name `None` for the overall performance.
+        """
+        keys, aggregates = [], []
+        for metric in overall_metrics:
+            keys.append((None, metric))
+            if metric == "qvt":
+                aggregates.append(QVT_AGGREGATE.format(DATASET_NAME=dataset_name, EVAL_NAME=eval_name))
+            else:
+                aggregates.append(OVERALL_AGGREGATE.format(METRIC_COL=METRIC_COL_MAPPING[metric]))
+        for subset_name, where_condition in subsets:
+            for metric in subset_metrics:
+                keys.append((subset_name, metric))
+                aggregates.append(SUBSET_AGGREGATE.format(WHERE_CONDITION=where_condition, METRIC_COL=METRIC_COL_MAPPING[metric]))
+        if not aggregates:
+            return dict()
+        
+        statetment = QUERY_EVALUATION_REPORT.format(
+            DATASET_NAME=dataset_name,
+            EVAL_NAME=eval_name,
+            AGGREGATES=", ".join(aggregates)
+        )
+        with self.engine.connect() as connection:
+            res = connection.execute(text(statetment)).first()
+        return dict(zip(keys, res))
+    
+    def _query_results_table_performance(self, dataset_name: str, eval_names: List[str], overall_metrics: List[str], subset_metrics: List[str], subsets: List[Tuple[str, str]]) -> Dict[str, Dict[Tuple[Optional[str], str], Optional[float]]]:
+        r"""
+        Performance of several evaluations from the `__EVALUATION_RESULT__` table, in a single query grouped by evaluation 
+        (and another one for `qvt`), used by leaderboards.
+        
+        Returns a mapping from evaluation name to the mapping returned by `_query_evaluation_report_performance`.
+        """
+        self._sync_results_table(dataset_name, eval_names)
+        keys = [(None, metric) for metric in overall_metrics] + \
+            [(subset_name, metric) for subset_name, _ in subsets for metric in subset_metrics]
+        performances = {eval_name: dict.fromkeys(keys) for eval_name in eval_names}
+        eval_names_str = ", ".join(f"'{eval_name}'" for eval_name in eval_names)
+        # each (evaluation, metric) group aggregates the overall performance followed by the performance of each subset
+        col_metrics = {METRIC_COL_MAPPING[metric]: metric for metric in overall_metrics + subset_metrics if metric != "qvt"}
+        aggregates = [RESULTS_AGGREGATE.format(WHERE_CONDITION="1 = 1")] + \
+            [RESULTS_AGGREGATE.format(WHERE_CONDITION=f"({where_condition})") for _, where_condition in subsets]
+        with self.engine.connect() as connection:
+            if col_metrics:
+                statetment = QUERY_RESULTS_REPORT.format(
+                    DATASET_NAME=dataset_name,
+                    AGGREGATES=", ".join(aggregates),
+                    METRIC_COLS=", ".join(f"'{metric_col}'" for metric_col in col_metrics.keys()),
+                    EVAL_NAMES=eval_names_str
+                )
+                for eval_name, metric_col, overall_value, *subset_values in connection.execute(text(statetment)):
+                    metric = col_metrics[metric_col]
+                    if metric in overall_metrics:
+                        performances[eval_name][(None, metric)] = overall_value
+                    if metric in subset_metrics:
+                        performances[eval_name].update(
+                            ((subset_name, metric), value) for (subset_name, _), value in zip(subsets, subset_values)
+                        )
+            if "qvt" in overall_metrics:
+                statetment = QUERY_RESULTS_QVT.format(DATASET_NAME=dataset_name, EVAL_NAMES=eval_names_str)
+                for eval_name, value in connection.execute(text(statetment)):
+                    performances[eval_name][(None, "qvt")] = value
+        return performances
+    
+    def _query_membership_performance(self, membership_store: "SubsetMembershipStore", eval_name: str, overall_metrics: List[str], subset_metrics: List[str], subset_conditions: List[Tuple[str, List[str]]]) -> Dict[Tuple[Optional[str], str], Optional[float]]:
+        r"""
+        Overall performance and performance of each subset `(name, filter conditions)` of an evaluation, 
+        aggregated in memory over the subset membership bitmaps (intersected for scenarios).
+        
+        Returns the same mapping as `_query_evaluation_report_performance`.
+        """
+        dataset_name = membership_store.dataset_name
+        metric_cols = {metric: METRIC_COL_MAPPING[metric] for metric in dict.fromkeys(overall_metrics + subset_metrics) if metric != "qvt"}
+        performance = dict()
+        if "qvt" in overall_metrics:
+            performance.update(self._query_evaluation_report_performance(dataset_name, eval_name, ["qvt"], [], []))
+        if not metric_cols:
+            return performance
+        
+        statetment = QUERY_EVALUATION_METRICS.format(
+            DATASET_NAME=dataset_name,
+            EVAL_NAME=eval_name,
+            METRIC_COLS=", ".join(dict.fromkeys(metric_cols.values()))
+        )
+        # fetched as plain tuples through the DBAPI cursor, NULLs becoming NaNs
+        with self.engine.connect() as connection:
+            cursor = connection.connection.cursor()
+            cursor.execute(statetment)
+            records = np.array(cursor.fetchall(), dtype=float).reshape(-1, len(set(metric_cols.values())) + 1)
+            cursor.close()
+        ids = records[:, 0].astype(np.int64)
+        values = {metric_col: records[:, i + 1] for i, metric_col in enumerate(dict.fromkeys(metric_cols.values()))}
+        
+        def select_ids(mask):
+            # evaluated samples missing from the dataset are never selected, as in the joined queries
+            selected = np.zeros(len(ids), dtype=bool)
+            in_range = ids < len(mask)
+            selected[in_range] = mask[ids[in_range]]
+            return selected
+        
+        def average(metric, selected):
+            metric_values = values[metric_cols[metric]]
+            metric_values = metric_values[selected & ~np.isnan(metric_values)]
+            if len(metric_values) == 0:
+                return None
+            # summed sequentially as `AVG` of SQLite
+            return float(np.cumsum(metric_values)[-1] / len(metric_values) * 100)
+        
+        selected = select_ids(membership_store.get_mask("1 = 1"))
+        for metric in overall_metrics:
+            if metric != "qvt":
+                performance[(None, metric)] = average(metric, selected)
+        for subset_name, conditions in subset_conditions:
+            selected = select_ids(membership_store.get_intersection_mask(conditions))
+            for metric in subset_metrics:
+                performance[(subset_name, metric)] = average(metric, selected)
+        return performance
+    
     def delete_dataset_history(self, dataset_name: str, delete_relavant_evaluations=True) -> None:
         logger.warning(
             "You are deleting the dataset history. Please enter `Y` / `YES` to confirm or enter `N` / `NO` to cancel the operation. "
@@ -503,15 +884,22 @@ class Core(_Core):
             return
         
         if flag in ["Y", "YES"]:
-            statements = [DELETE_DATASET_TABLE.format(DATASET_NAME=dataset_name), DELETE_DATASET_INFO.format(DATASET_NAME=dataset_name)]
+            statements = [
+                DELETE_DATASET_TABLE.format(DATASET_NAME=dataset_name), 
+                DELETE_DATASET_INFO.format(DATASET_NAME=dataset_name), 
+                DELETE_DATASET_SUBSET_MEMBERSHIP.format(DATASET_NAME=dataset_name)
+            ]
             if delete_relavant_evaluations:
                 for eval_name in self.query_available_evaluations(dataset_name)["Evaluation"].values:
                     statements.append(DELETE_EVALUATION_TABLE.format(DATASET_NAME=dataset_name, EVAL_NAME=eval_name))
+                statements.append(DELETE_DATASET_RESULTS.format(DATASET_NAME=dataset_name))
                     
             with self.engine.connect() as connection:
                 for stat in statements:
                     connection.execute(text(stat))
                 connection.commit()
+            self._columnar_engines.pop(dataset_name, None)
+            self._synced_evaluations = {pair for pair in self._synced_evaluations if pair[0] != dataset_name}
             logger.success(f"Delete dataset `{dataset_name}` successfully.")
             return
     
@@ -530,9 +918,16 @@ class Core(_Core):
             return
         
         if flag in ["Y", "YES"]:
-            statement = DELETE_EVALUATION_TABLE.format(DATASET_NAME=dataset_name, EVAL_NAME=eval_name)
+            statements = [
+                DELETE_EVALUATION_TABLE.format(DATASET_NAME=dataset_name, EVAL_NAME=eval_name),
+                DELETE_EVALUATION_RESULTS.format(DATASET_NAME=dataset_name, EVAL_NAME=eval_name)
+            ]
             with self.engine.connect() as connection:
-                connection.execute(text(statement))
+                for stat in statements:
+                    connection.execute(text(stat))
                 connection.commit()
+            if dataset_name in self._columnar_engines:
+                self._columnar_engines[dataset_name].invalidate(eval_name)
+            self._synced_evaluations.discard((dataset_name, eval_name))
             logger.success(f"Delete evaluation `{eval_name}` for dataset `{dataset_name}` successfully.")
             return
\ No newline at end of file
@@ -1,39 +1,85 @@
-from .model import Base, DatasetInfo, MetaDataset, MetaEvaluation, get_dataset_model, get_evaluation_model
+from .model import Base, DatasetInfo, GoldResult, EvaluationResult, SubsetMembership, MetaDataset, MetaEvaluation, get_dataset_model, get_evaluation_model, LazyModelDict
+from .gold_store import GoldResultStore
+from .subset_membership import SubsetMembershipStore
 from .util import (get_dataset_name_from_table_name,
                    get_dataset_name_and_evaluation_name_from_table_name,
                    get_dataset_info,
-                   get_dataset_samples)
+                   get_dataset_samples,
+                   add_missing_columns,
+                   get_finished_sample_ids,
+                   upsert_evaluation_rows,
+                   bulk_write,
+                   bulk_insert,
+                   sync_evaluation_results,
+                   is_evaluation_synced,
+                   create_feature_indexes)
 from .template import (METRIC_COL_MAPPING,
                        QUERY_OVERALL_PERFORMANCE,
                        QUERY_QVT_PERFORMANCE,
                        QUERY_SUBSET_PERFORMANCE,
+                       QUERY_EVALUATION_REPORT,
+                       OVERALL_AGGREGATE,
+                       SUBSET_AGGREGATE,
+                       QVT_AGGREGATE,
+                       QUERY_RESULTS_REPORT,
+                       RESULTS_AGGREGATE,
+                       QUERY_RESULTS_QVT,
+                       QUERY_EVALUATION_METRICS,
                        QUERY_DATASET_SIZE,
                        QUERY_DATASET_DOMAIN_DISTRIBUTION,
                        QUERY_DATASET_SQL_KEYWORDS_DISTRIBUTION,
                        DELETE_DATASET_TABLE,
                        DELETE_EVALUATION_TABLE,
-                       DELETE_DATASET_INFO)
+                       DELETE_DATASET_INFO,
+                       DELETE_EVALUATION_RESULTS,
+                       DELETE_DATASET_RESULTS,
+                       DELETE_DATASET_SUBSET_MEMBERSHIP)
 
 
 __all__ = [
     "Base",
     "DatasetInfo",
+    "GoldResult",
+    "EvaluationResult",
+    "SubsetMembership",
+    "SubsetMembershipStore",
+    "GoldResultStore",
     "MetaDataset",
     "MetaEvaluation",
     "get_dataset_model",
     "get_evaluation_model",
+    "LazyModelDict",
     "get_dataset_name_from_table_name",
     "get_dataset_name_and_evaluation_name_from_table_name",
     "get_dataset_info",
     "get_dataset_samples",
+    "add_missing_columns",
+    "get_finished_sample_ids",
+    "upsert_evaluation_rows",
+    "bulk_write",
+    "bulk_insert",
+    "sync_evaluation_results",
+    "is_evaluation_synced",
+    "create_feature_indexes",
     "METRIC_COL_MAPPING",
     "QUERY_OVERALL_PERFORMANCE",
     "QUERY_QVT_PERFORMANCE",
     "QUERY_SUBSET_PERFORMANCE",
+    "QUERY_EVALUATION_REPORT",
+    "OVERALL_AGGREGATE",
+    "SUBSET_AGGREGATE",
+    "QVT_AGGREGATE",
+    "QUERY_RESULTS_REPORT",
+    "RESULTS_AGGREGATE",
+    "QUERY_RESULTS_QVT",
+    "QUERY_EVALUATION_METRICS",
     "QUERY_DATASET_SIZE",
     "QUERY_DATASET_DOMAIN_DISTRIBUTION",
     "QUERY_DATASET_SQL_KEYWORDS_DISTRIBUTION",
     "DELETE_DATASET_TABLE",
     "DELETE_EVALUATION_TABLE",
-    "DELETE_DATASET_INFO"
+    "DELETE_DATASET_INFO",
+    "DELETE_EVALUATION_RESULTS",
+    "DELETE_DATASET_RESULTS",
+    "DELETE_DATASET_SUBSET_MEMBERSHIP"
 ]
\ No newline at end of file
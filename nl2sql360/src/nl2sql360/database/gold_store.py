@@ -0,0 +1,90 @@
+import os
+import pickle
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple, Any
+from sqlalchemy import Engine, select, delete
+from sqlalchemy.orm import Session
+from .model import GoldResult
+
+
+_DB_HASH_CACHE = dict()
+# sql hashes per `IN (...)` lookup, below the SQLite bound variable limit
+_LOOKUP_CHUNK_SIZE = 500
+# only successful executions are stored, as errors (e.g., a locked database) may be transient
+_STORED_STATUS = "result"
+
+
+def normalize_sql(sql: str) -> str:
+    # inner whitespace is kept, as it may belong to string literals (e.g., `'a  b'`)
+    return sql.strip().rstrip(";").strip()
+
+
+def hash_sql(sql: str) -> str:
+    return hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()
+
+
+def hash_database_file(db_path: str) -> Optional[str]:
+    r"""
+    Content hash of a database file, memorized by (path, size, mtime) to avoid re-reading unchanged files.
+    """
+    if not os.path.isfile(db_path):
+        return None
+    stat = os.stat(db_path)
+    memo_key = (os.path.abspath(db_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _DB_HASH_CACHE:
+        sha = hashlib.sha256()
+        with open(db_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        _DB_HASH_CACHE[memo_key] = sha.hexdigest()
+    return _DB_HASH_CACHE[memo_key]
+
+
+class GoldResultStore:
+    r"""
+    Persistent store of gold SQL execution results in the NL2SQL360-core database,
+    keyed by (database file hash, normalized gold SQL).
+
+    SQLite only: the rows are executed on read-only connections, so no prediction can have changed them,
+    and the file hash covers every change of the database. The changes of a PostgreSQL / MySQL server are not
+    covered by any file hash, hence the store is not used for these dialects.
+    """
+
+    def __init__(self, db_engine: "Engine") -> None:
+        self.db_engine = db_engine
+
+    def lookup(self, db_path: str, sqls: Iterable[str]) -> Dict[str, Tuple[str, Any]]:
+        db_hash = hash_database_file(db_path)
+        if db_hash is None:
+            return dict()
+        sql_hashes = {sql: hash_sql(sql) for sql in sqls}
+        unique_hashes = list(set(sql_hashes.values()))
+        stored = dict()
+        with Session(self.db_engine) as session:
+            for start in range(0, len(unique_hashes), _LOOKUP_CHUNK_SIZE):
+                statement = select(GoldResult).where(
+                    GoldResult.db_hash == db_hash,
+                    GoldResult.status == _STORED_STATUS,
+                    GoldResult.sql_hash.in_(unique_hashes[start: start + _LOOKUP_CHUNK_SIZE])
+                )
+                for record in session.scalars(statement):
+                    stored[record.sql_hash] = (record.status, pickle.loads(record.rows) if record.rows is not None else None)
+        return {sql: stored[sql_hash] for sql, sql_hash in sql_hashes.items() if sql_hash in stored}
+
+    def save(self, db_path: str, results: Dict[str, Tuple[str, Any]]) -> None:
+        db_hash = hash_database_file(db_path)
+        results = {sql: (status, rows) for sql, (status, rows) in results.items() if status == _STORED_STATUS}
+        if db_hash is None or not results:
+            return
+        with Session(self.db_engine) as session:
+            # Invalidate results of previous versions of the database file
+            session.execute(delete(GoldResult).where(GoldResult.db_path == db_path, GoldResult.db_hash != db_hash))
+            for sql, (status, rows) in results.items():
+                session.merge(GoldResult(
+                    db_hash=db_hash,
+                    sql_hash=hash_sql(sql),
+                    db_path=db_path,
+                    status=status,
+                    rows=pickle.dumps(rows) if rows is not None else None
+                ))
+            session.commit()
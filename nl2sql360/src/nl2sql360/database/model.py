@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from typing import Callable
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, LargeBinary, Index
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -14,6 +15,51 @@ class DatasetInfo(Base):
     tables_json_path = Column(String, nullable=True, default=None)
 
 
+class GoldResult(Base):
+    __tablename__ = "__GOLD_RESULT__"
+    
+    """Note:
+    `db_hash` is the content hash of the database file and `sql_hash` is the hash of the normalized gold SQL,
+    such that stored results are invalidated once the database file changes.
+    """
+    db_hash = Column(String, primary_key=True)
+    sql_hash = Column(String, primary_key=True)
+    db_path = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    rows = Column(LargeBinary, nullable=True, default=None)
+
+
+class EvaluationResult(Base):
+    __tablename__ = "__EVALUATION_RESULT__"
+    
+    """Note:
+    Long-format copy of the metric columns (e.g., `exec_acc`) of all evaluation tables, one row per non-NULL value,
+    maintained only with `enable_results_table`. The index covers per-metric aggregates grouped by evaluation.
+    """
+    dataset_name = Column(String, primary_key=True)
+    eval_name = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)
+    sample_id = Column(Integer, primary_key=True)
+    value = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_evaluation_result_metric", "dataset_name", "metric", "eval_name", "sample_id", "value"),
+    )
+
+
+class SubsetMembership(Base):
+    __tablename__ = "__SUBSET_MEMBERSHIP__"
+    
+    """Note:
+    `bitmap` packs (little-endian bit order) whether each sample id `0 .. num_ids - 1` of the dataset satisfies `condition`,
+    a serialized filter (e.g., `count_join > 0`). Scenarios are intersections of the bitmaps of their filters.
+    """
+    dataset_name = Column(String, primary_key=True)
+    condition = Column(String, primary_key=True)
+    num_ids = Column(Integer, nullable=False)
+    bitmap = Column(LargeBinary, nullable=False)
+
+
 class MetaDataset:
     
     id = Column(Integer, primary_key=True)
@@ -27,26 +73,34 @@ class MetaDataset:
     """
     complexity = Column(String, nullable=False)
     db_domain = Column(String, nullable=False)
-    
-    count_query_fields = Column(Integer, nullable=False)
-    count_group_by = Column(Integer, nullable=False)
-    count_order_by = Column(Integer, nullable=False)
-    count_limit = Column(Integer, nullable=False)
-    count_join = Column(Integer, nullable=False)
-    count_predicate = Column(Integer, nullable=False)
-    count_aggregation = Column(Integer, nullable=False)
-    count_scalar_function = Column(Integer, nullable=False)
-    count_subquery = Column(Integer, nullable=False)
-    count_set_operation = Column(Integer, nullable=False)
-    count_math_compute = Column(Integer, nullable=False)
-    count_logical_connector = Column(Integer, nullable=False)
-    count_distinct = Column(Integer, nullable=False)
-    count_like = Column(Integer, nullable=False)
-    count_control_flow = Column(Integer, nullable=False)
-    count_window = Column(Integer, nullable=False)
+
+    """Note:
+    SQL feature counts are NULL for gold SQLs failing to parse.
+    """
+    count_query_fields = Column(Integer, nullable=True)
+    count_group_by = Column(Integer, nullable=True)
+    count_order_by = Column(Integer, nullable=True)
+    count_limit = Column(Integer, nullable=True)
+    count_join = Column(Integer, nullable=True)
+    count_predicate = Column(Integer, nullable=True)
+    count_aggregation = Column(Integer, nullable=True)
+    count_scalar_function = Column(Integer, nullable=True)
+    count_subquery = Column(Integer, nullable=True)
+    count_set_operation = Column(Integer, nullable=True)
+    count_math_compute = Column(Integer, nullable=True)
+    count_logical_connector = Column(Integer, nullable=True)
+    count_distinct = Column(Integer, nullable=True)
+    count_like = Column(Integer, nullable=True)
+    count_control_flow = Column(Integer, nullable=True)
+    count_window = Column(Integer, nullable=True)
 
 
 class MetaEvaluation:
+    r"""
+    Note: `ves_ci` / `rves_ci` store the relative half-width of the 95% confidence interval
+    of the time ratio achieved when timing the sample, and `ves_mad` / `rves_mad` the median absolute deviation
+    of its per-iteration time ratios, all NULL for samples that are not timed.
+    """
 
     pred = Column(String, nullable=False)
     exec_acc = Column(Float, nullable=True, default=None)
@@ -54,6 +108,11 @@ class MetaEvaluation:
     ves = Column(Float, nullable=True, default=None)
     rves = Column(Float, nullable=True, default=None)
     f1 = Column(Float, nullable=True, default=None)
+    ves_ci = Column(Float, nullable=True, default=None)
+    rves_ci = Column(Float, nullable=True, default=None)
+    ves_mad = Column(Float, nullable=True, default=None)
+    rves_mad = Column(Float, nullable=True, default=None)
+    exec_status = Column(String, nullable=True, default=None)
 
 
 def get_dataset_model(dataset_name):
@@ -67,3 +126,36 @@ def get_evaluation_model(dataset_name, evaluation_name):
                 (MetaEvaluation, Base),
                 dict(id=Column(Integer, ForeignKey(f"DATASET_{dataset_name}"), primary_key=True),
                      __tablename__=f"DATASET_{dataset_name}_EVALUATION_{evaluation_name}"))
+
+
+class _ModelFactory:
+    
+    __slots__ = ("create",)
+    
+    def __init__(self, create: Callable[[], type]) -> None:
+        self.create = create
+
+
+class LazyModelDict(dict):
+    r"""
+    Mapping from table names to models, where a model registered with `set_factory` is only created on first access.
+    """
+    
+    def set_factory(self, table_name: str, create: Callable[[], type]) -> None:
+        super().__setitem__(table_name, _ModelFactory(create))
+    
+    def __getitem__(self, table_name: str) -> type:
+        model = super().__getitem__(table_name)
+        if isinstance(model, _ModelFactory):
+            model = model.create()
+            super().__setitem__(table_name, model)
+        return model
+    
+    def get(self, table_name: str, default=None):
+        return self[table_name] if table_name in self else default
+    
+    def values(self):
+        return [self[table_name] for table_name in self]
+    
+    def items(self):
+        return [(table_name, self[table_name]) for table_name in self]
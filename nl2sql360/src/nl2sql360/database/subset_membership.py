@@ -0,0 +1,66 @@
+from typing import Dict, List
+import numpy as np
+from sqlalchemy import Engine, select, delete, text
+from sqlalchemy.orm import Session
+from .model import SubsetMembership
+from .template import QUERY_SUBSET_IDS, QUERY_DATASET_MAX_ID
+
+
+class SubsetMembershipStore:
+    r"""
+    Persistent store of subset membership bitmaps of a dataset in the NL2SQL360-core database, keyed by serialized filter.
+    
+    Each filter is evaluated against `DATASET_<name>` once; scenarios intersect the bitmaps of their filters.
+    """
+    
+    def __init__(self, db_engine: "Engine", dataset_name: str) -> None:
+        self.db_engine = db_engine
+        self.dataset_name = dataset_name
+        self._masks: Dict[str, np.ndarray] = None
+        
+    def load(self) -> None:
+        self._masks = dict()
+        with Session(self.db_engine) as session:
+            for record in session.scalars(select(SubsetMembership).where(SubsetMembership.dataset_name == self.dataset_name)):
+                bits = np.unpackbits(np.frombuffer(record.bitmap, dtype=np.uint8), count=record.num_ids, bitorder="little")
+                self._masks[record.condition] = bits.astype(bool)
+    
+    def get_mask(self, condition: str) -> np.ndarray:
+        r"""
+        Boolean mask indexed by sample id of the samples satisfying a serialized filter.
+        """
+        if self._masks is None:
+            self.load()
+        if condition not in self._masks:
+            with self.db_engine.connect() as conn:
+                max_id = conn.execute(text(QUERY_DATASET_MAX_ID.format(DATASET_NAME=self.dataset_name))).scalar()
+                ids = np.fromiter(
+                    conn.scalars(text(QUERY_SUBSET_IDS.format(DATASET_NAME=self.dataset_name, WHERE_CONDITION=condition))), dtype=np.int64
+                )
+            mask = np.zeros((max_id + 1) if max_id is not None else 0, dtype=bool)
+            mask[ids] = True
+            with Session(self.db_engine) as session:
+                session.merge(SubsetMembership(
+                    dataset_name=self.dataset_name,
+                    condition=condition,
+                    num_ids=len(mask),
+                    bitmap=np.packbits(mask, bitorder="little").tobytes()
+                ))
+                session.commit()
+            self._masks[condition] = mask
+        return self._masks[condition]
+    
+    def get_intersection_mask(self, conditions: List[str]) -> np.ndarray:
+        r"""
+        Boolean mask indexed by sample id of the samples satisfying all serialized filters, all samples without any filter.
+        """
+        if not conditions:
+            return self.get_mask("1 = 1")
+        masks = [self.get_mask(condition) for condition in conditions]
+        return np.logical_and.reduce(masks) if len(masks) > 1 else masks[0]
+    
+    def clear(self) -> None:
+        with Session(self.db_engine) as session:
+            session.execute(delete(SubsetMembership).where(SubsetMembership.dataset_name == self.dataset_name))
+            session.commit()
+        self._masks = dict()
@@ -29,6 +29,84 @@ SELECT AVG(exec_acc) * 100 FROM (
 """
 
 
+QUERY_EVALUATION_REPORT = \
+"""
+SELECT {AGGREGATES} from DATASET_{DATASET_NAME}_EVALUATION_{EVAL_NAME} AS e JOIN DATASET_{DATASET_NAME} AS d ON e.id = d.id;
+"""
+
+
+OVERALL_AGGREGATE = "AVG({METRIC_COL}) * 100"
+
+
+SUBSET_AGGREGATE = "AVG(CASE WHEN {WHERE_CONDITION} THEN {METRIC_COL} END) * 100"
+
+
+QVT_AGGREGATE = \
+"""(
+    SELECT AVG(exec_acc) * 100 FROM (
+        SELECT AVG(exec_acc) as exec_acc FROM DATASET_{DATASET_NAME}_EVALUATION_{EVAL_NAME} AS e JOIN DATASET_{DATASET_NAME} AS d ON e.id = d.id GROUP BY gold HAVING COUNT(d.gold) >= 2 and sum(e.exec_acc) != 0
+    )
+)"""
+
+
+QUERY_RESULTS_REPORT = \
+"""
+SELECT r.eval_name, r.metric, {AGGREGATES} FROM __EVALUATION_RESULT__ AS r JOIN DATASET_{DATASET_NAME} AS d ON r.sample_id = d.id 
+WHERE r.dataset_name = '{DATASET_NAME}' AND r.metric IN ({METRIC_COLS}) AND r.eval_name IN ({EVAL_NAMES}) GROUP BY r.eval_name, r.metric;
+"""
+
+
+RESULTS_AGGREGATE = "AVG(CASE WHEN {WHERE_CONDITION} THEN r.value END) * 100"
+
+
+QUERY_RESULTS_QVT = \
+"""
+SELECT eval_name, AVG(exec_acc) * 100 FROM (
+    SELECT r.eval_name AS eval_name, AVG(r.value) as exec_acc FROM __EVALUATION_RESULT__ AS r JOIN DATASET_{DATASET_NAME} AS d ON r.sample_id = d.id 
+    WHERE r.dataset_name = '{DATASET_NAME}' AND r.metric = 'exec_acc' AND r.eval_name IN ({EVAL_NAMES}) 
+    GROUP BY r.eval_name, d.gold HAVING COUNT(d.gold) >= 2 and sum(r.value) != 0
+) GROUP BY eval_name;
+"""
+
+
+SYNC_EVALUATION_RESULTS = \
+"""
+INSERT OR REPLACE INTO __EVALUATION_RESULT__ (dataset_name, eval_name, metric, sample_id, value) 
+SELECT '{DATASET_NAME}', '{EVAL_NAME}', '{METRIC_COL}', id, {METRIC_COL} FROM DATASET_{DATASET_NAME}_EVALUATION_{EVAL_NAME} 
+WHERE {METRIC_COL} IS NOT NULL AND {WHERE_CONDITION};
+"""
+
+
+QUERY_RESULTS_EVALUATION_EXISTS = \
+"""
+SELECT 1 FROM __EVALUATION_RESULT__ WHERE dataset_name = '{DATASET_NAME}' AND eval_name = '{EVAL_NAME}' LIMIT 1;
+"""
+
+
+QUERY_SUBSET_IDS = \
+"""
+SELECT id FROM DATASET_{DATASET_NAME} WHERE {WHERE_CONDITION};
+"""
+
+
+QUERY_DATASET_MAX_ID = \
+"""
+SELECT MAX(id) FROM DATASET_{DATASET_NAME};
+"""
+
+
+QUERY_EVALUATION_METRICS = \
+"""
+SELECT id, {METRIC_COLS} FROM DATASET_{DATASET_NAME}_EVALUATION_{EVAL_NAME};
+"""
+
+
+CREATE_FEATURE_INDEX = \
+"""
+CREATE INDEX IF NOT EXISTS ix_DATASET_{DATASET_NAME}_{FEATURE_COL} ON DATASET_{DATASET_NAME} ({FEATURE_COL}, id);
+"""
+
+
 QUERY_DATASET_SIZE = \
 """
 SELECT COUNT(*), COUNT(DISTINCT gold) FROM DATASET_{DATASET_NAME};
@@ -79,3 +157,21 @@ DELETE_EVALUATION_TABLE = \
 """
 DROP TABLE IF EXISTS DATASET_{DATASET_NAME}_EVALUATION_{EVAL_NAME};
 """
+
+
+DELETE_EVALUATION_RESULTS = \
+"""
+DELETE FROM __EVALUATION_RESULT__ WHERE dataset_name = '{DATASET_NAME}' AND eval_name = '{EVAL_NAME}';
+"""
+
+
+DELETE_DATASET_RESULTS = \
+"""
+DELETE FROM __EVALUATION_RESULT__ WHERE dataset_name = '{DATASET_NAME}';
+"""
+
+
+DELETE_DATASET_SUBSET_MEMBERSHIP = \
+"""
+DELETE FROM __SUBSET_MEMBERSHIP__ WHERE dataset_name = '{DATASET_NAME}';
+"""
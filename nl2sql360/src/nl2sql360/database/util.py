@@ -1,7 +1,10 @@
-from typing import Optional, Dict, Any
-from sqlalchemy import Engine
+from typing import Optional, Dict, Any, List, Set, Iterator, Tuple
+from contextlib import contextmanager
+from sqlalchemy import Engine, Connection, inspect, text, select, insert, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from .model import DatasetInfo, MetaDataset, get_dataset_model
+from .model import DatasetInfo, MetaDataset, MetaEvaluation, get_dataset_model
+from .template import METRIC_COL_MAPPING, SYNC_EVALUATION_RESULTS, QUERY_RESULTS_EVALUATION_EXISTS, CREATE_FEATURE_INDEX
 
 
 
@@ -36,3 +39,106 @@ def get_dataset_samples(db_engine: "Engine", dataset_model: "MetaDataset") -> Op
         "db_id": record.db_id,
         } for record in query_res]
 
+
+
+def add_missing_columns(db_engine: "Engine", model) -> None:
+    r"""
+    Add the nullable columns of `model` missing from its existing table, e.g. tables created by older versions.
+    """
+    existing_columns = {column["name"] for column in inspect(db_engine).get_columns(model.__tablename__)}
+    with db_engine.begin() as conn:
+        for column in model.__table__.columns:
+            if column.name not in existing_columns and column.nullable:
+                column_type = column.type.compile(dialect=db_engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{model.__tablename__}" ADD COLUMN "{column.name}" {column_type}'))
+
+
+def get_finished_sample_ids(db_engine: "Engine", evaluation_model: "MetaEvaluation", metrics: List[str]) -> Set[int]:
+    r"""
+    Ids of the samples in an evaluation table whose `metrics` columns are all filled.
+    """
+    condition = and_(*[getattr(evaluation_model, metric).is_not(None) for metric in metrics])
+    with db_engine.connect() as conn:
+        return set(conn.scalars(select(evaluation_model.id).where(condition)))
+
+
+# rows per executemany, bounding the memory of the parameter batches
+BULK_INSERT_CHUNK_SIZE = 5000
+
+
+@contextmanager
+def bulk_write(db_engine: "Engine") -> Iterator["Connection"]:
+    r"""
+    Connection in one transaction for bulk writes, with WAL journaling and `synchronous=NORMAL` applied to the SQLite database
+    during the write only. The previous journal mode is restored afterwards, such that the database stays a single file.
+    """
+    with db_engine.connect() as conn:
+        journal_mode, synchronous = None, None
+        if db_engine.dialect.name == "sqlite":
+            journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            conn.exec_driver_sql("PRAGMA synchronous=NORMAL")
+            conn.commit()
+        try:
+            with conn.begin():
+                yield conn
+        finally:
+            if synchronous is not None:
+                conn.exec_driver_sql(f"PRAGMA synchronous={synchronous}")
+                # leaving WAL checkpoints the `-wal` file into the database file
+                conn.exec_driver_sql(f"PRAGMA journal_mode={journal_mode}")
+                conn.commit()
+
+
+def bulk_insert(conn: "Connection", model, rows: List[Dict[str, Any]], chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> None:
+    for start in range(0, len(rows), chunk_size):
+        conn.execute(insert(model.__table__), rows[start: start + chunk_size])
+
+
+def upsert_evaluation_rows(db_engine: "Engine", evaluation_model: "MetaEvaluation", rows: List[Dict[str, Any]]) -> None:
+    r"""
+    Insert evaluation rows in one transaction, updating the given columns of rows whose id already exists.
+    """
+    if not rows:
+        return
+    stmt = sqlite_insert(evaluation_model.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={column: stmt.excluded[column] for column in rows[0].keys() if column != "id"}
+    )
+    with bulk_write(db_engine) as conn:
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            conn.execute(stmt, rows[start: start + BULK_INSERT_CHUNK_SIZE])
+
+
+def sync_evaluation_results(db_engine: "Engine", dataset_name: str, eval_name: str, id_range: Optional[Tuple[int, int]] = None) -> None:
+    r"""
+    Copy the metric columns of an evaluation table, restricted to ids within `id_range` if given, into `__EVALUATION_RESULT__`.
+    """
+    where_condition = "1 = 1" if id_range is None else f"id BETWEEN {int(id_range[0])} AND {int(id_range[1])}"
+    with db_engine.begin() as conn:
+        for metric_col in METRIC_COL_MAPPING.values():
+            if metric_col is None:
+                continue
+            conn.execute(text(SYNC_EVALUATION_RESULTS.format(
+                DATASET_NAME=dataset_name,
+                EVAL_NAME=eval_name,
+                METRIC_COL=metric_col,
+                WHERE_CONDITION=where_condition
+            )))
+
+
+def is_evaluation_synced(db_engine: "Engine", dataset_name: str, eval_name: str) -> bool:
+    with db_engine.connect() as conn:
+        return conn.execute(text(QUERY_RESULTS_EVALUATION_EXISTS.format(DATASET_NAME=dataset_name, EVAL_NAME=eval_name))).first() is not None
+
+
+def create_feature_indexes(db_engine: "Engine", dataset_name: str) -> None:
+    r"""
+    Create an index on `(count_*, id)` for each SQL feature column of a dataset table, covering filter / scenario subsets.
+    """
+    feature_cols = [name for name in vars(MetaDataset).keys() if name.startswith("count_")]
+    with db_engine.begin() as conn:
+        for feature_col in feature_cols:
+            conn.execute(text(CREATE_FEATURE_INDEX.format(DATASET_NAME=dataset_name, FEATURE_COL=feature_col)))
@@ -3,46 +3,93 @@ import os
 from ..arguments import DatasetArguments
 import json
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 
 class NL2SQLDataset:
+    r"""
+    NL2SQL dataset loaded from a json (list of samples) or jsonl (one sample per line) samples file.
+
+    The samples file is read once, keeping only the columns used by the getters (a list per key).
+    Jsonl files, and json files when `ijson` is installed, are streamed instead of being loaded as a whole.
+    """
     
     def __init__(self, dataset_args: "DatasetArguments") -> None:
         self.dataset_args = dataset_args
+        self._columns = None
+        self._domain_mapping = None
+        
+    @property
+    def samples_file_path(self):
+        return os.path.join(self.dataset_args.dataset_dir, self.dataset_args.samples_file)
+        
+    def iter_samples(self):
+        if self.dataset_args.samples_file.endswith(".jsonl"):
+            with open(self.samples_file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        elif ijson is not None:
+            with open(self.samples_file_path, "rb") as f:
+                # `use_float` yields python floats instead of decimals, as `json.load` does
+                yield from ijson.items(f, "item", use_float=True)
+        else:
+            with open(self.samples_file_path, "r", encoding="utf-8") as f:
+                yield from json.load(f)
         
     def get_all_samples(self):
-        with open(os.path.join(self.dataset_args.dataset_dir, self.dataset_args.samples_file), "r", encoding="utf-8") as f:
-            samples = json.load(f)
-            return samples
+        return list(self.iter_samples())
+    
+    @property
+    def columns(self):
+        if self._columns is None:
+            keys = [self.dataset_args.question_key, self.dataset_args.sql_key, self.dataset_args.db_id_key]
+            if self.dataset_args.sql_complexity_key is not None:
+                keys.append(self.dataset_args.sql_complexity_key)
+            columns = {key: [] for key in keys}
+            for item in self.iter_samples():
+                for key in keys:
+                    columns[key].append(item[key])
+            self._columns = columns
+        return self._columns
         
     def get_all_questions(self):
-        return [item[self.dataset_args.question_key] for item in self.get_all_samples()]
+        return list(self.columns[self.dataset_args.question_key])
     
     def get_all_sqls(self):
-        return [item[self.dataset_args.sql_key] for item in self.get_all_samples()]
+        return list(self.columns[self.dataset_args.sql_key])
     
     def get_all_db_ids(self):
-        return [item[self.dataset_args.db_id_key] for item in self.get_all_samples()]
+        return list(self.columns[self.dataset_args.db_id_key])
 
     def get_all_sql_complexity(self):
         if self.dataset_args.sql_complexity_key is not None:
-            return [item[self.dataset_args.sql_complexity_key] for item in self.get_all_samples()]
+            return list(self.columns[self.dataset_args.sql_complexity_key])
         else:
-            return ["<UNK>" for _ in self.get_all_samples()]
+            return ["<UNK>" for _ in range(len(self))]
+
+    def get_database_domain_mapping(self):
+        if self._domain_mapping is None:
+            if self.dataset_args.database_domain_file is not None:
+                with open(os.path.join(self.dataset_args.dataset_dir, self.dataset_args.database_domain_file), "r", encoding="utf-8") as f:
+                    self._domain_mapping = json.load(f)
+            else:
+                self._domain_mapping = dict()
+        return self._domain_mapping
 
     def get_all_database_domains(self):
-        if self.dataset_args.database_domain_file is not None:
-            with open(os.path.join(self.dataset_args.dataset_dir, self.dataset_args.database_domain_file), "r", encoding="utf-8") as f:
-                domain_mapping = json.load(f)
-        else:
-            domain_mapping = dict()
-        return [domain_mapping.get(item[self.dataset_args.db_id_key], "<UNK>") for item in self.get_all_samples()]
+        domain_mapping = self.get_database_domain_mapping()
+        return [domain_mapping.get(db_id, "<UNK>") for db_id in self.columns[self.dataset_args.db_id_key]]
     
     def get_all_database_paths(self):
         return [os.path.join(self.dataset_args.dataset_dir, 
                              self.dataset_args.database_dir, 
-                             item[self.dataset_args.db_id_key],
-                             f"{item[self.dataset_args.db_id_key]}.sqlite"
-                             ) for item in self.get_all_samples()]
+                             db_id,
+                             f"{db_id}.sqlite"
+                             ) for db_id in self.columns[self.dataset_args.db_id_key]]
     
     def get_tables(self):
         if self.dataset_args.tables_file is None:
@@ -52,5 +99,4 @@ class NL2SQLDataset:
                 return json.load(f)
     
     def __len__(self):
-        return len(self.get_all_samples())
-
+        return len(self.columns[self.dataset_args.db_id_key])
@@ -3,6 +3,8 @@ from .spider_ex_em import SpiderEXEMEvaluator
 from .ves import VesEvaluator
 from .rves import RVesEvaluator
 from .f1 import F1Evaluator
+from .executor import SQLExecutor
+from .bird_eval.exec_cache import ExecutionCache
 
 
 __all__ = [
@@ -10,5 +12,7 @@ __all__ = [
     "SpiderEXEMEvaluator",
     "VesEvaluator",
     "RVesEvaluator",
-    "F1Evaluator"
+    "F1Evaluator",
+    "SQLExecutor",
+    "ExecutionCache"
 ]
\ No newline at end of file
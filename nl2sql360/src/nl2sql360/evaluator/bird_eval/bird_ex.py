@@ -1,23 +1,26 @@
 import sys
 import argparse
 import multiprocessing as mp
-from func_timeout import func_timeout, FunctionTimedOut
 from .evaluation_utils import (
     load_json,
     execute_sql,
+    QueryTimeout,
+    group_by_database,
+    execute_batch,
     package_sqls,
     sort_results,
     print_data,
 )
+from .result_table import ResultTable
 from tqdm import tqdm
 
 exec_result = []
 progress_bar = None
 
 
-def result_callback(result):
-    exec_result.append(result)
-    progress_bar.update()
+def batch_callback(results):
+    exec_result.extend(results)
+    progress_bar.update(len(results))
 
 
 def calculate_ex(predicted_res, ground_truth_res):
@@ -31,21 +34,20 @@ def execute_model(
     predicted_sql, ground_truth, db_place, idx, meta_time_out, sql_dialect, **kwds
 ):
     try:
-        res = func_timeout(
-            meta_time_out,
-            execute_sql,
-            args=(predicted_sql, ground_truth, db_place, sql_dialect, calculate_ex),
-            kwargs=kwds
+        res = execute_sql(
+            predicted_sql, ground_truth, db_place, sql_dialect, calculate_ex,
+            timeout=meta_time_out, **kwds
         )
+        status = "result"
     except KeyboardInterrupt:
         sys.exit(0)
-    except FunctionTimedOut:
-        result = [(f"timeout",)]
+    except QueryTimeout:
+        status = "timeout"
         res = 0
     except Exception as e:
-        result = [(f"error",)]  # possibly len(query) > 512 or not executable
+        status = "error"  # possibly len(query) > 512 or not executable
         res = 0
-    result = {"sql_idx": idx, "res": res}
+    result = {"sql_idx": idx, "res": res, "status": status}
     return result
 
 
@@ -56,20 +58,15 @@ def run_sqls_parallel(
     exec_result.clear()
     progress_bar = tqdm(total=len(sqls))
     pool = mp.Pool(processes=num_cpus)
-    for i, sql_pair in enumerate(sqls):
-        predicted_sql, ground_truth = sql_pair
+    for batch in group_by_database(db_places, num_cpus):
         pool.apply_async(
-            execute_model,
+            execute_batch,
             args=(
-                predicted_sql,
-                ground_truth,
-                db_places[i],
-                i,
-                meta_time_out,
-                sql_dialect,
+                execute_model,
+                [(*sqls[i], db_places[i], i, meta_time_out, sql_dialect) for i in batch],
             ),
             kwds=kwds,
-            callback=result_callback,
+            callback=batch_callback,
         )
     pool.close()
     pool.join()
@@ -77,43 +74,8 @@ def run_sqls_parallel(
 
 
 def compute_acc_by_diff(exec_results, diff_json_path):
-    num_queries = len(exec_results)
-    results = [res["res"] for res in exec_results]
     contents = load_json(diff_json_path)
-    simple_results, moderate_results, challenging_results = [], [], []
-
-    for i, content in enumerate(contents):
-        if content["difficulty"] == "simple":
-            simple_results.append(exec_results[i])
-
-        if content["difficulty"] == "moderate":
-            moderate_results.append(exec_results[i])
-
-        if content["difficulty"] == "challenging":
-            try:
-                challenging_results.append(exec_results[i])
-            except:
-                print(i)
-
-    simple_acc = sum([res["res"] for res in simple_results]) / len(simple_results)
-    moderate_acc = sum([res["res"] for res in moderate_results]) / len(moderate_results)
-    challenging_acc = sum([res["res"] for res in challenging_results]) / len(
-        challenging_results
-    )
-    all_acc = sum(results) / num_queries
-    count_lists = [
-        len(simple_results),
-        len(moderate_results),
-        len(challenging_results),
-        num_queries,
-    ]
-    return (
-        simple_acc * 100,
-        moderate_acc * 100,
-        challenging_acc * 100,
-        all_acc * 100,
-        count_lists,
-    )
+    return ResultTable.from_diff_json(exec_results, contents).scores_by_level("res")
 
 
 if __name__ == "__main__":
@@ -3,16 +3,22 @@ import json
 import numpy as np
 import argparse
 import multiprocessing as mp
-from func_timeout import func_timeout, FunctionTimedOut
 from .evaluation_utils import (
     load_json,
     package_sqls,
     sort_results,
     print_data,
-    connect_db,
+    get_connection,
+    reset_connection,
+    statement_timeout,
+    QueryTimeout,
+    group_by_database,
+    execute_batch,
+    ratio_rel_error,
 )
-import time
-import math
+from functools import partial
+from .timing import time_pair, median_mad, median_rel_error, pin_worker_cpu
+from .result_table import ResultTable
 from tqdm import tqdm
 
 exec_result = []
@@ -23,51 +29,62 @@ def result_callback(result):
     progress_bar.update()
 
 
+def batch_callback(results):
+    exec_result.extend(results)
+    progress_bar.update(len(results))
+
+
 def clean_abnormal(input):
     input = np.asarray(input)
-    processed_list = []
     mean = np.mean(input, axis=0)
     std = np.std(input, axis=0)
-    for x in input:
-        if x < mean + 3 * std and x > mean - 3 * std:
-            processed_list.append(x)
-    return processed_list
+    return input[(input < mean + 3 * std) & (input > mean - 3 * std)].tolist()
 
 
-def execute_sql(sql, db_path, sql_dialect, return_time=False, **kwds):
-    # Connect to the database
-    conn = connect_db(sql_dialect, db_path, **kwds)
-    start_time = time.time()
-    cursor = conn.cursor()
-    cursor.execute(sql)
-    res = cursor.fetchall()
-    conn.close()  # Don't forget to close the connection!
-    exec_time = time.time() - start_time
-    if return_time:
-        return exec_time
-
+def execute_sql(sql, db_path, sql_dialect, timeout=None, **kwds):
+    conn = get_connection(sql_dialect, db_path, **kwds)
+    try:
+        with statement_timeout(conn, sql_dialect, timeout):
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            res = cursor.fetchall()
+            cursor.close()
+    finally:
+        reset_connection(sql_dialect, db_path, **kwds)
     return res
 
 
+def summarize_ratios(ratios, statistic="median"):
+    r"""
+    Aggregate per-iteration time ratios into (time ratio, relative CI half-width), either by the median
+    or by the legacy mean after 3-sigma outlier rejection.
+    """
+    if statistic == "mean":
+        processed_ratios = clean_abnormal(ratios)
+        return sum(processed_ratios) / len(processed_ratios), ratio_rel_error(processed_ratios)
+    return median_mad(ratios)[0], median_rel_error(ratios)
+
+
 def iterated_execute_sql(
-    predicted_sql, ground_truth, db_path, iterate_num, sql_dialect, exec_acc, **kwds
+    predicted_sql, ground_truth, db_path, iterate_num, sql_dialect, exec_acc, timeout=None,
+    min_iterate_num=None, target_rel_error=None, statistic="median", warmup=1, interleave=True, **kwds
 ):
-    diff_list = []
-    predicted_res = execute_sql(predicted_sql, db_path, sql_dialect, **kwds)
-    ground_truth_res = execute_sql(ground_truth, db_path, sql_dialect, **kwds)
+    # with `target_rel_error`, stop timing once the relative CI half-width of the time ratio reaches it
+    rel_error = None
+    mad = None
+    if exec_acc is None:
+        predicted_res = execute_sql(predicted_sql, db_path, sql_dialect, timeout=timeout, **kwds)
+        ground_truth_res = execute_sql(ground_truth, db_path, sql_dialect, timeout=timeout, **kwds)
     reward = 0
     time_ratio = 0
     if (exec_acc is None and set(predicted_res) == set(ground_truth_res)) or (exec_acc is not None and exec_acc == 1):
-        for _ in range(iterate_num):
-            predicted_time = execute_sql(
-                predicted_sql, db_path, sql_dialect, return_time=True, **kwds
-            )
-            ground_truth_time = execute_sql(
-                ground_truth, db_path, sql_dialect, return_time=True, **kwds
-            )
-            diff_list.append(ground_truth_time / predicted_time)
-        processed_diff_list = clean_abnormal(diff_list)
-        time_ratio = sum(processed_diff_list) / len(processed_diff_list)
+        summarize = partial(summarize_ratios, statistic=statistic)
+        ratios = time_pair(
+            predicted_sql, ground_truth, db_path, sql_dialect, iterate_num, warmup, interleave, timeout,
+            min_iterate_num=min_iterate_num, target_rel_error=target_rel_error, summarize=summarize, **kwds
+        )
+        time_ratio, rel_error = summarize(ratios)
+        mad = median_mad(ratios)[1]
     if time_ratio == 0:
         reward = 0
     elif time_ratio >= 2:
@@ -81,31 +98,32 @@ def iterated_execute_sql(
     else:
         reward = 0.25
     # return time_ratio
-    return reward
+    return reward, rel_error, mad
 
 
 def execute_model(
-    predicted_sql, ground_truth, db_place, idx, iterate_num, meta_time_out, sql_dialect, exec_acc, **kwds
+    predicted_sql, ground_truth, db_place, idx, iterate_num, meta_time_out, sql_dialect, exec_acc,
+    min_iterate_num=None, target_rel_error=None, timing_kwds=None, **kwds
 ):
+    rel_error = None
+    mad = None
     try:
-        # you can personalize the total timeout number
-        # larger timeout leads to more stable ves
-        # while it needs more your patience....
-        reward = func_timeout(
-            meta_time_out * iterate_num,
-            iterated_execute_sql,
-            args=(predicted_sql, ground_truth, db_place, iterate_num, sql_dialect, exec_acc),
-            kwargs=kwds
+        # each execution is interrupted after `meta_time_out` seconds
+        reward, rel_error, mad = iterated_execute_sql(
+            predicted_sql, ground_truth, db_place, iterate_num, sql_dialect, exec_acc,
+            timeout=meta_time_out, min_iterate_num=min_iterate_num, target_rel_error=target_rel_error,
+            **(timing_kwds or {}), **kwds
         )
+        status = "result"
     except KeyboardInterrupt:
         sys.exit(0)
-    except FunctionTimedOut:
-        result = [(f"timeout",)]
+    except QueryTimeout:
+        status = "timeout"
         reward = 0
     except Exception as e:
-        result = [(f"error",)]  # possibly len(query) > 512 or not executable
+        status = "error"  # possibly len(query) > 512 or not executable
         reward = 0
-    result = {"sql_idx": idx, "reward": reward}
+    result = {"sql_idx": idx, "reward": reward, "rel_error": rel_error, "mad": mad, "status": status}
     return result
 
 
@@ -117,29 +135,37 @@ def run_sqls_parallel(
     meta_time_out=30.0,
     sql_dialect="SQLite",
     exec_acc_list=None,
+    min_iterate_num=None,
+    target_rel_error=None,
+    statistic="median",
+    warmup=1,
+    interleave=True,
+    pin_cpu=False,
     **kwds
 ):
     global exec_result, progress_bar
     exec_result.clear()
     progress_bar = tqdm(total=len(sqls))
-    pool = mp.Pool(processes=num_cpus)
-    for i, sql_pair in enumerate(sqls):
-        predicted_sql, ground_truth = sql_pair
+    pool = mp.Pool(processes=num_cpus, initializer=pin_worker_cpu if pin_cpu else None)
+    timing_kwds = {"statistic": statistic, "warmup": warmup, "interleave": interleave}
+    timed_indices = []
+    for i in range(len(sqls)):
         exec_acc = exec_acc_list[i] if exec_acc_list else None
+        if exec_acc is not None and exec_acc != 1:
+            # incorrect predictions are not timed, skip the execution (status `skipped`, besides `result` / `timeout` / `error`)
+            result_callback({"sql_idx": i, "reward": 0, "rel_error": None, "mad": None, "status": "skipped"})
+            continue
+        timed_indices.append(i)
+    for batch in group_by_database(db_places, num_cpus, indices=timed_indices):
         pool.apply_async(
-            execute_model,
+            execute_batch,
             args=(
-                predicted_sql,
-                ground_truth,
-                db_places[i],
-                i,
-                iterate_num,
-                meta_time_out,
-                sql_dialect,
-                exec_acc
+                execute_model,
+                [(*sqls[i], db_places[i], i, iterate_num, meta_time_out, sql_dialect,
+                  exec_acc_list[i] if exec_acc_list else None, min_iterate_num, target_rel_error, timing_kwds) for i in batch],
             ),
             kwds=kwds,
-            callback=result_callback,
+            callback=batch_callback,
         )
     pool.close()
     pool.join()
@@ -147,40 +173,12 @@ def run_sqls_parallel(
 
 
 def compute_ves(exec_results):
-    num_queries = len(exec_results)
-    total_reward = 0
-    count = 0
-
-    for i, result in enumerate(exec_results):
-        if result["reward"] != 0:
-            count += 1
-        total_reward += math.sqrt(result["reward"]) * 100
-    ves = total_reward / num_queries
-    return ves
+    return float(ResultTable.from_results(exec_results).aggregate()["reward"][-1])
 
 
 def compute_ves_by_diff(exec_results, diff_json_path):
-    num_queries = len(exec_results)
     contents = load_json(diff_json_path)
-    simple_results, moderate_results, challenging_results = [], [], []
-    for i, content in enumerate(contents):
-        if content["difficulty"] == "simple":
-            simple_results.append(exec_results[i])
-        if content["difficulty"] == "moderate":
-            moderate_results.append(exec_results[i])
-        if content["difficulty"] == "challenging":
-            challenging_results.append(exec_results[i])
-    simple_ves = compute_ves(simple_results)
-    moderate_ves = compute_ves(moderate_results)
-    challenging_ves = compute_ves(challenging_results)
-    all_ves = compute_ves(exec_results)
-    count_lists = [
-        len(simple_results),
-        len(moderate_results),
-        len(challenging_results),
-        num_queries,
-    ]
-    return simple_ves, moderate_ves, challenging_ves, all_ves, count_lists
+    return ResultTable.from_diff_json(exec_results, contents).scores_by_level("reward")
 
 
 def print_reward_category(exec_results, engine, sql_dialect):
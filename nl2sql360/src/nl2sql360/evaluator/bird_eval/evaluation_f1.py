@@ -1,14 +1,17 @@
 import sys
 import argparse
 import multiprocessing as mp
-from func_timeout import func_timeout, FunctionTimedOut
 from .evaluation_utils import (
     load_json,
     execute_sql,
+    QueryTimeout,
+    group_by_database,
+    execute_batch,
     package_sqls,
     sort_results,
     print_data,
 )
+from .result_table import ResultTable
 from tqdm import tqdm
 
 exec_result = []
@@ -104,39 +107,29 @@ def calculate_f1_score(predicted, ground_truth):
     return f1_score
 
 
-def result_callback(result):
-    exec_result.append(result)
-    progress_bar.update()
+def batch_callback(results):
+    exec_result.extend(results)
+    progress_bar.update(len(results))
 
 
 def execute_model(
     predicted_sql, ground_truth, db_place, idx, meta_time_out, sql_dialect, **kwds
 ):
     try:
-        res = func_timeout(
-            meta_time_out,
-            execute_sql,
-            args=(
-                predicted_sql,
-                ground_truth,
-                db_place,
-                sql_dialect,
-                calculate_f1_score,
-            ),
-            kwargs=kwds
+        res = execute_sql(
+            predicted_sql, ground_truth, db_place, sql_dialect, calculate_f1_score,
+            timeout=meta_time_out, **kwds
         )
+        status = "result"
     except KeyboardInterrupt:
         sys.exit(0)
-    except FunctionTimedOut:
-        result = [(f"timeout",)]
+    except QueryTimeout:
+        status = "timeout"
         res = 0
     except Exception as e:
-        result = [(f"error",)]  # possibly len(query) > 512 or not executable
+        status = "error"  # possibly len(query) > 512 or not executable
         res = 0
-    # print(result)
-    # result = str(set([ret[0] for ret in result]))
-    result = {"sql_idx": idx, "res": res}
-    # print(result)
+    result = {"sql_idx": idx, "res": res, "status": status}
     return result
 
 
@@ -147,21 +140,15 @@ def run_sqls_parallel(
     exec_result.clear()
     progress_bar = tqdm(total=len(sqls))
     pool = mp.Pool(processes=num_cpus)
-    for i, sql_pair in enumerate(sqls):
-
-        predicted_sql, ground_truth = sql_pair
+    for batch in group_by_database(db_places, num_cpus):
         pool.apply_async(
-            execute_model,
+            execute_batch,
             args=(
-                predicted_sql,
-                ground_truth,
-                db_places[i],
-                i,
-                meta_time_out,
-                sql_dialect,
+                execute_model,
+                [(*sqls[i], db_places[i], i, meta_time_out, sql_dialect) for i in batch],
             ),
             kwds=kwds,
-            callback=result_callback,
+            callback=batch_callback,
         )
     pool.close()
     pool.join()
@@ -169,47 +156,8 @@ def run_sqls_parallel(
 
 
 def compute_f1_by_diff(exec_results, diff_json_path):
-    num_queries = len(exec_results)
-    results = [res["res"] for res in exec_results]
     contents = load_json(diff_json_path)
-    simple_results, moderate_results, challenging_results = [], [], []
-
-    for i, content in enumerate(contents):
-        if content["difficulty"] == "simple":
-            simple_results.append(exec_results[i])
-
-        if content["difficulty"] == "moderate":
-            moderate_results.append(exec_results[i])
-
-        if content["difficulty"] == "challenging":
-            try:
-                challenging_results.append(exec_results[i])
-            except:
-                print(i)
-
-    simple_f1 = sum([res["res"] for res in simple_results]) / len(simple_results) * 100
-    moderate_f1 = (
-        sum([res["res"] for res in moderate_results]) / len(moderate_results) * 100
-    )
-    challenging_f1 = (
-        sum([res["res"] for res in challenging_results])
-        / len(challenging_results)
-        * 100
-    )
-    all_f1 = sum(results) / num_queries * 100
-    count_lists = [
-        len(simple_results),
-        len(moderate_results),
-        len(challenging_results),
-        num_queries,
-    ]
-    return (
-        simple_f1,
-        moderate_f1,
-        challenging_f1,
-        all_f1,
-        count_lists,
-    )
+    return ResultTable.from_diff_json(exec_results, contents).scores_by_level("res")
 
 
 if __name__ == "__main__":
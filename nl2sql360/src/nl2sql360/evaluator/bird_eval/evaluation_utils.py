@@ -1,7 +1,11 @@
 import json
-import psycopg2
-import pymysql
+import math
+import time
 import sqlite3
+import pathlib
+from contextlib import contextmanager
+from collections import defaultdict
+from multiprocessing.util import Finalize
 
 
 def load_json(dir):
@@ -10,7 +14,10 @@ def load_json(dir):
     return contents
 
 
+# `psycopg2` / `pymysql` are imported on first use of their dialect, keeping SQLite-only runs from loading them
+
 def connect_postgresql(dbname="BIRD", user="root", host="localhost", password="password", port=5432):
+    import psycopg2
     # Open database connection
     # Connect to the database
     db = psycopg2.connect(
@@ -20,6 +27,7 @@ def connect_postgresql(dbname="BIRD", user="root", host="localhost", password="p
 
 
 def connect_mysql(dbname="BIRD", user="root", host="localhost", password="password", port=3306):
+    import pymysql
     # Open database connection
     # Connect to the database"
     db = pymysql.connect(
@@ -34,30 +42,203 @@ def connect_mysql(dbname="BIRD", user="root", host="localhost", password="passwo
 
 
 def connect_db(sql_dialect, db_path, **kwds):
+    r"""
+    Open a read-only connection, such that predicted DML / DDL can never change the benchmark database.
+    """
+    kwds = {key: value for key, value in kwds.items() if value is not None}
     if sql_dialect == "SQLite":
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(f"{pathlib.Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
     elif sql_dialect == "MySQL":
         conn = connect_mysql(**kwds)
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION TRANSACTION READ ONLY")
+        cursor.close()
     elif sql_dialect == "PostgreSQL":
         conn = connect_postgresql(**kwds)
+        conn.set_session(readonly=True)
     else:
         raise ValueError("Unsupported SQL dialect")
     return conn
 
 
-def execute_sql(predicted_sql, ground_truth, db_path, sql_dialect, calculate_func, **kwds):
-    conn = connect_db(sql_dialect, db_path, **kwds)
-    # Connect to the database
+# Per-process connection pool, keyed by dialect and database path (SQLite) or DSN (MySQL / PostgreSQL)
+_connection_pool = dict()
+_pool_finalizer = None
+
+
+def _connection_key(sql_dialect, db_path, **kwds):
+    if sql_dialect == "SQLite":
+        return (sql_dialect, db_path)
+    return (sql_dialect, kwds.get("host"), kwds.get("port"), kwds.get("dbname"), kwds.get("user"))
+
+
+def get_connection(sql_dialect, db_path, **kwds):
+    global _pool_finalizer
+    key = _connection_key(sql_dialect, db_path, **kwds)
+    conn = _connection_pool.get(key, None)
+    if conn is None:
+        conn = connect_db(sql_dialect, db_path, **kwds)
+        _connection_pool[key] = conn
+        if _pool_finalizer is None:
+            # close pooled connections when the (worker) process shuts down
+            _pool_finalizer = Finalize(None, close_connections, exitpriority=10)
+    return conn
+
+
+def reset_connection(sql_dialect, db_path, **kwds):
+    r"""
+    Roll back the open transaction of a pooled connection, such that the statements of a sample
+    are never visible to later samples. A connection failing to roll back (e.g., lost) is closed and dropped from the pool.
+    """
+    key = _connection_key(sql_dialect, db_path, **kwds)
+    conn = _connection_pool.get(key, None)
+    if conn is None:
+        return
+    try:
+        conn.rollback()
+    except Exception:
+        _connection_pool.pop(key, None)
+        _session_timeouts.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def close_connections():
+    _session_timeouts.clear()
+    while _connection_pool:
+        _, conn = _connection_pool.popitem()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class QueryTimeout(Exception):
+    r"""
+    Raised when a query is interrupted for exceeding its execution timeout.
+    """
+
+
+# Number of SQLite virtual machine instructions between two deadline checks
+_SQLITE_PROGRESS_STEPS = 1000
+# MySQL error code for exceeding `MAX_EXECUTION_TIME`
+_MYSQL_QUERY_TIMEOUT_ERRNO = 3024
+_session_timeouts = dict()
+
+
+def _set_session_timeout(conn, sql_dialect, timeout):
+    timeout_ms = int(timeout * 1000) if timeout else 0
+    if _session_timeouts.get(id(conn), None) == timeout_ms:
+        return
     cursor = conn.cursor()
-    cursor.execute(predicted_sql)
-    predicted_res = cursor.fetchall()
-    cursor.execute(ground_truth)
-    ground_truth_res = cursor.fetchall()
-    conn.close()
+    if sql_dialect == "PostgreSQL":
+        cursor.execute(f"SET statement_timeout = {timeout_ms}")
+    elif sql_dialect == "MySQL":
+        cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {timeout_ms}")
+    cursor.close()
+    # the connection is not in autocommit mode, keep the setting through the rollbacks after each sample
+    conn.commit()
+    _session_timeouts[id(conn)] = timeout_ms
+
+
+@contextmanager
+def statement_timeout(conn, sql_dialect, timeout):
+    r"""
+    Interrupt the statements executed inside the context once they run longer than `timeout` seconds,
+    by the SQLite progress handler, PostgreSQL `statement_timeout` or MySQL `MAX_EXECUTION_TIME`.
+    """
+    if sql_dialect == "SQLite":
+        if not timeout:
+            yield
+            return
+        deadline = time.monotonic() + timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, _SQLITE_PROGRESS_STEPS)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if time.monotonic() > deadline and "interrupted" in str(e):
+                raise QueryTimeout() from e
+            raise
+        finally:
+            conn.set_progress_handler(None, _SQLITE_PROGRESS_STEPS)
+    elif sql_dialect == "PostgreSQL":
+        import psycopg2
+        _set_session_timeout(conn, sql_dialect, timeout)
+        try:
+            yield
+        except psycopg2.extensions.QueryCanceledError as e:
+            raise QueryTimeout() from e
+    elif sql_dialect == "MySQL":
+        import pymysql
+        _set_session_timeout(conn, sql_dialect, timeout)
+        try:
+            yield
+        except pymysql.err.OperationalError as e:
+            if e.args and e.args[0] == _MYSQL_QUERY_TIMEOUT_ERRNO:
+                raise QueryTimeout() from e
+            raise
+    else:
+        raise ValueError("Unsupported SQL dialect")
+
+
+def fetch_sql(sql, db_path, sql_dialect, timeout=None, **kwds):
+    conn = get_connection(sql_dialect, db_path, **kwds)
+    cursor = conn.cursor()
+    try:
+        with statement_timeout(conn, sql_dialect, timeout):
+            cursor.execute(sql)
+            return cursor.fetchall()
+    finally:
+        cursor.close()
+        reset_connection(sql_dialect, db_path, **kwds)
+
+
+def execute_sql(predicted_sql, ground_truth, db_path, sql_dialect, calculate_func, timeout=None, **kwds):
+    predicted_res = fetch_sql(predicted_sql, db_path, sql_dialect, timeout, **kwds)
+    ground_truth_res = fetch_sql(ground_truth, db_path, sql_dialect, timeout, **kwds)
     res = calculate_func(predicted_res, ground_truth_res)
     return res
 
 
+def ratio_rel_error(ratios, z=1.96):
+    r"""
+    Relative half-width of the (95% by default) confidence interval of the mean of `ratios`.
+    """
+    n = len(ratios)
+    if n < 2:
+        return math.inf
+    mean = sum(ratios) / n
+    if mean == 0:
+        return math.inf
+    std = math.sqrt(sum((x - mean) ** 2 for x in ratios) / (n - 1))
+    return float(z * std / math.sqrt(n) / mean)
+
+
+def group_by_database(db_places, num_cpus, indices=None):
+    r"""
+    Shard sample indices by database into contiguous batches, such that each worker keeps
+    one database hot while executing a batch. Larger databases groups are scheduled first.
+    """
+    indices = range(len(db_places)) if indices is None else indices
+    groups = defaultdict(list)
+    for i in indices:
+        groups[db_places[i]].append(i)
+    num_samples = sum(len(group) for group in groups.values())
+    # a few batches per worker to keep the load balanced
+    batch_size = max(1, math.ceil(num_samples / (num_cpus * 4)))
+    batches = []
+    for group in sorted(groups.values(), key=len, reverse=True):
+        for start in range(0, len(group), batch_size):
+            batches.append(group[start:start + batch_size])
+    return batches
+
+
+def execute_batch(func, batch_args, **kwds):
+    return [func(*args, **kwds) for args in batch_args]
+
+
 def package_sqls(
     sql_path, db_root_path, engine, sql_dialect="SQLite", mode="gpt", data_mode="dev"
 ):
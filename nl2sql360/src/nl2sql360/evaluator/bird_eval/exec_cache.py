@@ -0,0 +1,125 @@
+import sys
+import hashlib
+import multiprocessing as mp
+from .evaluation_utils import fetch_sql, group_by_database, execute_batch, QueryTimeout
+from tqdm import tqdm
+
+exec_result = []
+progress_bar = None
+
+
+def batch_callback(results):
+    exec_result.extend(results)
+    progress_bar.update(len(results))
+
+
+class ExecutionCache:
+    r"""
+    Content-addressed cache of SQL execution results.
+
+    Each entry is keyed by the hash of (database place, SQL) and stores the execution
+    status (`result`, `error` or `timeout`) together with the fetched rows, such that
+    every metric can reuse the same execution instead of running the SQL again.
+    """
+
+    RESULT = "result"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+
+    def __init__(self) -> None:
+        self._entries = dict()
+        # (predicted, ground truth) key pairs whose rows could not be compared, e.g. unhashable rows
+        self._failed_pairs = set()
+
+    @staticmethod
+    def make_key(db_place, sql):
+        return hashlib.sha1(f"{db_place}\x00{sql.strip()}".encode("utf-8")).hexdigest()
+
+    def __contains__(self, item):
+        db_place, sql = item
+        return self.make_key(db_place, sql) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, key, status, rows=None):
+        self._entries[key] = (status, rows)
+
+    def get(self, db_place, sql):
+        return self._entries.get(self.make_key(db_place, sql), (self.ERROR, None))
+
+    def compute(self, predicted_sql, ground_truth, db_place, calculate_func):
+        r"""
+        Apply `calculate_func` on the cached rows of a (predicted, ground truth) pair,
+        scoring 0 if either of them failed to execute.
+        """
+        predicted_status, predicted_res = self.get(db_place, predicted_sql)
+        ground_truth_status, ground_truth_res = self.get(db_place, ground_truth)
+        if predicted_status != self.RESULT or ground_truth_status != self.RESULT:
+            return 0
+        try:
+            return calculate_func(predicted_res, ground_truth_res)
+        except Exception:
+            # as a failure inside an execution worker, the sample scores 0 with the `error` status
+            self._failed_pairs.add((self.make_key(db_place, predicted_sql), self.make_key(db_place, ground_truth)))
+            return 0
+
+    def status(self, db_place, predicted_sql, ground_truth):
+        r"""
+        Execution status of a sample: `error` if its rows failed to be compared, otherwise the status of the predicted SQL.
+        """
+        if (self.make_key(db_place, predicted_sql), self.make_key(db_place, ground_truth)) in self._failed_pairs:
+            return self.ERROR
+        return self.get(db_place, predicted_sql)[0]
+
+
+def execute_model(sql, db_place, key, meta_time_out, sql_dialect, **kwds):
+    try:
+        rows = fetch_sql(sql, db_place, sql_dialect, timeout=meta_time_out, **kwds)
+        status = ExecutionCache.RESULT
+    except KeyboardInterrupt:
+        sys.exit(0)
+    except QueryTimeout:
+        rows = None
+        status = ExecutionCache.TIMEOUT
+    except Exception as e:
+        rows = None
+        status = ExecutionCache.ERROR
+    result = {"key": key, "status": status, "rows": rows}
+    return result
+
+
+def run_sqls_parallel(
+    sqls, db_places, num_cpus=1, meta_time_out=30.0, sql_dialect="SQLite", cache=None, **kwds
+):
+    r"""
+    Execute every distinct (database, SQL) pair among the (predicted, ground truth) pairs
+    exactly once, and fill the results into the execution cache.
+    """
+    global exec_result, progress_bar
+    cache = cache if cache is not None else ExecutionCache()
+    pending = dict()
+    for i, sql_pair in enumerate(sqls):
+        for sql in sql_pair:
+            key = ExecutionCache.make_key(db_places[i], sql)
+            if key not in pending and (db_places[i], sql) not in cache:
+                pending[key] = (sql, db_places[i])
+    exec_result.clear()
+    progress_bar = tqdm(total=len(pending))
+    pending_items = list(pending.items())
+    pool = mp.Pool(processes=num_cpus)
+    for batch in group_by_database([db_place for _, (_, db_place) in pending_items], num_cpus):
+        pool.apply_async(
+            execute_batch,
+            args=(
+                execute_model,
+                [(*pending_items[i][1], pending_items[i][0], meta_time_out, sql_dialect) for i in batch],
+            ),
+            kwds=kwds,
+            callback=batch_callback,
+        )
+    pool.close()
+    pool.join()
+    for result in exec_result:
+        cache.put(result["key"], result["status"], result["rows"])
+    return cache
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class ResultTable:
+    r"""
+    Columnar container of per-sample evaluation results backed by NumPy arrays.
+
+    Columns are `sql_idx`, `res` (EX or F1), `time_ratio` (VES), `reward` (RVES) and `difficulty`.
+    Per-difficulty and overall aggregates are computed as one masked reduction over all columns,
+    instead of looping over the result dicts.
+    """
+
+    LEVELS = ("simple", "moderate", "challenging")
+    COLUMNS = ("res", "time_ratio", "reward")
+    # efficiency metrics average the square root of the ratio / reward
+    SQRT_COLUMNS = ("time_ratio", "reward")
+
+    def __init__(self, sql_idx, difficulty=None, **columns) -> None:
+        self.sql_idx = np.asarray(sql_idx, dtype=np.int64)
+        num_results = len(self.sql_idx)
+        # difficulty levels are encoded by their position in `LEVELS`, -1 for unknown levels
+        level_codes = {level: code for code, level in enumerate(self.LEVELS)}
+        self.difficulty = np.full(num_results, -1, dtype=np.int8)
+        if difficulty is not None:
+            self.difficulty[:len(difficulty)] = [level_codes.get(level, -1) for level in difficulty]
+        self.columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        self._masks = None
+
+    @classmethod
+    def from_results(cls, exec_results, difficulties=None):
+        r"""
+        Build the table from the result dicts of `run_sqls_parallel`, aligned positionally with `difficulties`.
+        """
+        columns = {
+            name: [result[name] for result in exec_results]
+            for name in cls.COLUMNS if exec_results and name in exec_results[0]
+        }
+        if difficulties is not None:
+            difficulties = list(difficulties)[:len(exec_results)]
+        return cls([result["sql_idx"] for result in exec_results], difficulties, **columns)
+
+    @classmethod
+    def from_diff_json(cls, exec_results, contents):
+        return cls.from_results(exec_results, [content["difficulty"] for content in contents])
+
+    def __len__(self):
+        return len(self.sql_idx)
+
+    @property
+    def masks(self):
+        r"""
+        Boolean matrix of shape (#levels + 1, #results), the last row selecting all results.
+        """
+        if self._masks is None:
+            self._masks = np.vstack(
+                [self.difficulty == code for code in range(len(self.LEVELS))] + [np.ones(len(self), dtype=bool)]
+            )
+        return self._masks
+
+    def level_counts(self):
+        return [int(count) for count in self.masks.sum(axis=1)]
+
+    def aggregate(self):
+        r"""
+        Mean of every column (square-rooted for efficiency columns) per difficulty level and overall, in percent.
+        """
+        names = list(self.columns.keys())
+        if not names:
+            return dict()
+        values = np.column_stack([
+            np.sqrt(self.columns[name]) if name in self.SQRT_COLUMNS else self.columns[name] for name in names
+        ])
+        masks = self.masks.astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = masks @ values / masks.sum(axis=1, keepdims=True) * 100
+        return {name: means[:, i] for i, name in enumerate(names)}
+
+    def scores_by_level(self, column):
+        r"""
+        (simple, moderate, challenging, total, counts) of a column, as returned by the `compute_*_by_diff` functions.
+        """
+        simple, moderate, challenging, total = (float(score) for score in self.aggregate()[column])
+        return simple, moderate, challenging, total, self.level_counts()
@@ -0,0 +1,138 @@
+import os
+import math
+import time
+import sqlite3
+import multiprocessing as mp
+from contextlib import contextmanager
+import numpy as np
+from .evaluation_utils import get_connection, reset_connection, statement_timeout, QueryTimeout, _SQLITE_PROGRESS_STEPS
+
+# scale factor such that MAD estimates the standard deviation of normally distributed data
+_MAD_TO_STD = 1.4826
+# asymptotic efficiency of the median relative to the mean for normally distributed data
+_MEDIAN_SE_FACTOR = math.sqrt(math.pi / 2)
+_Z_95 = 1.96
+
+
+def pin_worker_cpu():
+    r"""
+    Pool initializer pinning each worker process to its own CPU, where the platform supports it.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    cpus = sorted(os.sched_getaffinity(0))
+    identity = mp.current_process()._identity
+    worker_idx = identity[0] - 1 if identity else 0
+    os.sched_setaffinity(0, {cpus[worker_idx % len(cpus)]})
+
+
+@contextmanager
+def timed_statements(conn, sql_dialect, timeout=None):
+    r"""
+    Install the per-statement timeout of a connection once for a series of timed statements.
+
+    Yields a function restarting the timeout, called before each statement outside of its timed window,
+    such that no timeout setup is measured. PostgreSQL / MySQL session timeouts apply to each statement by themselves.
+    """
+    if sql_dialect != "SQLite" or not timeout:
+        with statement_timeout(conn, sql_dialect, timeout):
+            yield lambda: None
+        return
+    deadline = [math.inf]
+
+    def restart_timeout():
+        deadline[0] = time.monotonic() + timeout
+
+    conn.set_progress_handler(lambda: time.monotonic() > deadline[0], _SQLITE_PROGRESS_STEPS)
+    try:
+        yield restart_timeout
+    except sqlite3.OperationalError as e:
+        if time.monotonic() > deadline[0] and "interrupted" in str(e):
+            raise QueryTimeout() from e
+        raise
+    finally:
+        conn.set_progress_handler(None, _SQLITE_PROGRESS_STEPS)
+
+
+def measure_sql(conn, sql, restart_timeout=None):
+    r"""
+    Nanoseconds spent executing `sql` and fetching its rows on an open connection.
+    """
+    cursor = conn.cursor()
+    if restart_timeout is not None:
+        restart_timeout()
+    start_time = time.perf_counter_ns()
+    cursor.execute(sql)
+    cursor.fetchall()
+    exec_time = time.perf_counter_ns() - start_time
+    cursor.close()
+    # guard against a zero reading of the clock on trivial queries
+    return max(exec_time, 1)
+
+
+def median_mad(ratios):
+    ratios = np.asarray(ratios, dtype=float)
+    median = float(np.median(ratios))
+    mad = float(np.median(np.abs(ratios - median)))
+    return median, mad
+
+
+def median_rel_error(ratios, z=_Z_95):
+    r"""
+    Relative half-width of the confidence interval of the median of `ratios`, based on the MAD.
+    """
+    n = len(ratios)
+    if n < 2:
+        return math.inf
+    median, mad = median_mad(ratios)
+    if median == 0:
+        return math.inf
+    std_error = _MEDIAN_SE_FACTOR * _MAD_TO_STD * mad / math.sqrt(n)
+    return z * std_error / median
+
+
+def time_pair(
+    predicted_sql,
+    ground_truth,
+    db_path,
+    sql_dialect,
+    iterate_num=100,
+    warmup=1,
+    interleave=True,
+    timeout=None,
+    min_iterate_num=None,
+    target_rel_error=None,
+    summarize=None,
+    **kwds
+):
+    r"""
+    Collect per-iteration time ratios (ground truth / predicted) of a SQL pair on the pooled connection.
+
+    Both queries are first run `warmup` times untimed, so that caches are warm and the connection is set up.
+    Each iteration times the pair back to back; with `interleave`, the order alternates between iterations (ABBA),
+    cancelling slow drift of the machine, otherwise the predicted SQL always runs first.
+    With `target_rel_error`, timing stops once `summarize(ratios)` reports a relative error below it, in both modes.
+    """
+    conn = get_connection(sql_dialect, db_path, **kwds)
+    summarize = summarize if summarize is not None else lambda ratios: (median_mad(ratios)[0], median_rel_error(ratios))
+    ratios = []
+    try:
+        with timed_statements(conn, sql_dialect, timeout) as restart_timeout:
+            for _ in range(warmup):
+                measure_sql(conn, predicted_sql, restart_timeout)
+                measure_sql(conn, ground_truth, restart_timeout)
+
+            for i in range(iterate_num):
+                if interleave and i % 2 == 1:
+                    ground_truth_time = measure_sql(conn, ground_truth, restart_timeout)
+                    predicted_time = measure_sql(conn, predicted_sql, restart_timeout)
+                else:
+                    predicted_time = measure_sql(conn, predicted_sql, restart_timeout)
+                    ground_truth_time = measure_sql(conn, ground_truth, restart_timeout)
+                ratios.append(ground_truth_time / predicted_time)
+                if target_rel_error is not None and len(ratios) >= (min_iterate_num or 2):
+                    if summarize(ratios)[1] <= target_rel_error:
+                        break
+    finally:
+        reset_connection(sql_dialect, db_path, **kwds)
+    return ratios
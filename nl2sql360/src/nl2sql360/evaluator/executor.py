@@ -0,0 +1,55 @@
+from .bird_eval.exec_cache import run_sqls_parallel, ExecutionCache
+from collections import defaultdict
+from loguru import logger
+import os
+
+
+class SQLExecutor:
+
+    def __init__(self, sql_dialect="SQLite", **kwds) -> None:
+        self.sql_dialect = sql_dialect
+        self.db_host = kwds.get("db_host", None)
+        self.db_port = kwds.get("db_port", None)
+        self.db_name = kwds.get("db_name", None)
+        self.user = kwds.get("db_user", None)
+        self.password = kwds.get("db_password", None)
+
+    def execute(self, gold_sqls, pred_sqls, db_ids, db_dir, **kwds) -> "ExecutionCache":
+        query_pairs = list(zip(pred_sqls, gold_sqls))
+        db_places = [os.path.join(db_dir, db_id, f"{db_id}.sqlite") for db_id in db_ids]
+        exec_cache = kwds.get("exec_cache", None)
+        exec_cache = exec_cache if exec_cache is not None else ExecutionCache()
+
+        # Gold results are only persisted for SQLite databases, executed read-only and invalidated by their content hash
+        gold_store = kwds.get("gold_store", None) if self.sql_dialect == "SQLite" else None
+        gold_sqls_by_db = defaultdict(set)
+        for gold_sql, db_place in zip(gold_sqls, db_places):
+            gold_sqls_by_db[db_place].add(gold_sql)
+        stored_gold_sqls = set()
+        if gold_store is not None:
+            for db_place, sqls in gold_sqls_by_db.items():
+                for sql, (status, rows) in gold_store.lookup(db_place, sqls).items():
+                    exec_cache.put(ExecutionCache.make_key(db_place, sql), status, rows)
+                    stored_gold_sqls.add((db_place, sql))
+            logger.info(f"Reuse {len(stored_gold_sqls)} stored gold SQL results.")
+
+        exec_cache = run_sqls_parallel(
+            sqls=query_pairs,
+            db_places=db_places,
+            num_cpus=kwds.get("num_processes", 8),
+            meta_time_out=kwds.get("timeout", 30),
+            sql_dialect=self.sql_dialect,
+            cache=exec_cache,
+            host=self.db_host,
+            user=self.user,
+            password=self.password,
+            dbname=self.db_name,
+            port=self.db_port
+        )
+
+        if gold_store is not None:
+            for db_place, sqls in gold_sqls_by_db.items():
+                results = {sql: exec_cache.get(db_place, sql) for sql in sqls if (db_place, sql) not in stored_gold_sqls}
+                # Only successful results are persisted, timeouts and errors may be transient
+                gold_store.save(db_place, results)
+        return exec_cache
@@ -1,4 +1,4 @@
-from .bird_eval.evaluation_f1 import run_sqls_parallel, sort_results
+from .bird_eval.evaluation_f1 import run_sqls_parallel, sort_results, calculate_f1_score
 import os
 
 
@@ -15,6 +15,12 @@ class F1Evaluator:
     def evaluate(self, gold_sqls, pred_sqls, db_ids, db_dir, **kwds):
         query_pairs = list(zip(pred_sqls, gold_sqls))
         db_places = [os.path.join(db_dir, db_id, f"{db_id}.sqlite") for db_id in db_ids]
+        exec_cache = kwds.get("exec_cache", None)
+        if exec_cache is not None:
+            return {
+                "f1": [exec_cache.compute(predicted_sql, ground_truth, db_place, calculate_f1_score)
+                       for (predicted_sql, ground_truth), db_place in zip(query_pairs, db_places)]
+            }
         exec_result = run_sqls_parallel(
             sqls=query_pairs,
             db_places=db_places,
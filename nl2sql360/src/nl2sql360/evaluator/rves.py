@@ -1,4 +1,5 @@
 from .bird_eval.bird_rves import run_sqls_parallel, sort_results
+from .bird_eval.bird_ex import calculate_ex
 import os
 import math
 from loguru import logger
@@ -14,6 +15,13 @@ class RVesEvaluator:
         self.db_name = kwds.get("db_name", None)
         self.user = kwds.get("db_user", None)
         self.password = kwds.get("db_password", None)
+        self.iterate_num = kwds.get("iterate_num", 100)
+        self.min_iterate_num = kwds.get("min_iterate_num", None)
+        self.target_rel_error = kwds.get("target_rel_error", None)
+        self.timing_statistic = kwds.get("timing_statistic", "median")
+        self.warmup = kwds.get("warmup", 1)
+        self.interleave = kwds.get("interleave", True)
+        self.pin_cpu = kwds.get("pin_cpu", False)
     
     def evaluate(self, gold_sqls, pred_sqls, db_ids, db_dir, **kwds):
         query_pairs = list(zip(pred_sqls, gold_sqls))
@@ -21,6 +29,10 @@ class RVesEvaluator:
         exec_acc_list = kwds.get("exec_acc_list", None)
         if self.reuse_ex and exec_acc_list is None:
             logger.warning("VES evaluator is set to reuse the EX result, but it has not been passed in.")
+        exec_cache = kwds.get("exec_cache", None)
+        if exec_acc_list is None and exec_cache is not None:
+            exec_acc_list = [exec_cache.compute(predicted_sql, ground_truth, db_place, calculate_ex)
+                             for (predicted_sql, ground_truth), db_place in zip(query_pairs, db_places)]
         rves_result = run_sqls_parallel(
             sqls=query_pairs,
             db_places=db_places,
@@ -28,6 +40,13 @@ class RVesEvaluator:
             meta_time_out=kwds.get("timeout", 30),
             sql_dialect=self.sql_dialect,
             exec_acc_list=exec_acc_list,
+            iterate_num=self.iterate_num,
+            min_iterate_num=self.min_iterate_num,
+            target_rel_error=self.target_rel_error,
+            statistic=self.timing_statistic,
+            warmup=self.warmup,
+            interleave=self.interleave,
+            pin_cpu=self.pin_cpu,
             host=self.db_host,
             user=self.user,
             password=self.password,
@@ -35,10 +54,15 @@ class RVesEvaluator:
             port=self.db_port
         )
         rves_result = sort_results(rves_result)
+        rves_ci = [res['rel_error'] if res['rel_error'] is not None and math.isfinite(res['rel_error']) else None
+                  for res in rves_result]
+        rves_mad = [res['mad'] for res in rves_result]
         rves_result = [math.sqrt(res['reward']) for res in rves_result]
         return {
-            "rves": rves_result
+            "rves": rves_result,
+            "rves_ci": rves_ci,
+            "rves_mad": rves_mad
         }
     
     def get_eval_metrics(self):
-        return ["rves"]
+        return ["rves", "rves_ci", "rves_mad"]
@@ -4,9 +4,11 @@ from loguru import logger
 
 class SpiderEXEMEvaluator:
     
-    def __init__(self, eval_ex, eval_em):
+    def __init__(self, eval_ex, eval_em, plug_value=False, plug_value_budget=None):
         self.eval_ex = eval_ex
         self.eval_em = eval_em
+        self.plug_value = plug_value
+        self.plug_value_budget = plug_value_budget
         
     def get_eval_metrics(self):
         eval_metrics = []
@@ -45,9 +47,12 @@ class SpiderEXEMEvaluator:
             db_dir=db_dir,
             etype=etype,
             kmaps=kmaps,
-            plug_value=False,
+            plug_value=self.plug_value,
             keep_distinct=False,
-            progress_bar_for_each_datapoint=False
+            progress_bar_for_each_datapoint=False,
+            num_processes=kwds.get("num_processes", 8),
+            plug_value_budget=self.plug_value_budget,
+            timeout=kwds.get("timeout", 60)
         )
 
         return {
@@ -27,8 +27,8 @@ from tqdm import tqdm
 from copy import deepcopy
 from loguru import logger
 
-from .process_sql import get_schema, Schema, get_sql
-from .exec_eval import eval_exec_match
+from .process_sql import get_schema, get_cached_schema, prewarm_schemas, Schema, get_sql
+from .exec_eval import eval_exec_match_parallel, clear_gold_cache, TIMEOUT
 
 # Flag to disable value evaluation
 DISABLE_VALUE = True
@@ -523,7 +523,8 @@ def print_scores(scores, etype, include_turn_acc=True):
             print_formated_s("exact match", exact_scores, '{:<20.3f}')
 
 
-def evaluate(golds, preds, db_dir, etype, kmaps, plug_value, keep_distinct, progress_bar_for_each_datapoint):
+def evaluate(golds, preds, db_dir, etype, kmaps, plug_value, keep_distinct, progress_bar_for_each_datapoint, num_processes=1,
+             plug_value_budget=None, timeout=TIMEOUT):
 
     glist = []
     gseq_one = []
@@ -580,6 +581,26 @@ def evaluate(golds, preds, db_dir, etype, kmaps, plug_value, keep_distinct, prog
     
     parse_g_sql_error_flag = False
 
+    # reflect every database once up front, shared by all samples
+    prewarm_schemas(os.path.join(db_dir, g[1], g[1] + ".sqlite") for g_seq in glist for g in g_seq)
+
+    # execute all samples up front with a process pool, in the order of the samples
+    if etype in ["all", "exec"]:
+        pairs = [(p[0], g[0], os.path.join(db_dir, g[1], g[1] + ".sqlite"))
+                 for p_seq, g_seq in zip(plist, glist) for p, g in zip(p_seq, g_seq)]
+        exec_scores = iter(eval_exec_match_parallel(
+            dbs=[db for _, _, db in pairs],
+            p_strs=[p_str for p_str, _, _ in pairs],
+            g_strs=[g_str for _, g_str, _ in pairs],
+            plug_value=plug_value,
+            keep_distinct=keep_distinct,
+            num_processes=num_processes,
+            plug_value_budget=plug_value_budget,
+            timeout=timeout
+        ))
+        # all denotations are computed, release the gold results cached by this process
+        clear_gold_cache()
+
     for i, (p, g) in enumerate(zip(plist, glist)):
         if (i + 1) % 10 == 0:
             print('Evaluating %dth prediction' % (i + 1))
@@ -592,7 +613,7 @@ def evaluate(golds, preds, db_dir, etype, kmaps, plug_value, keep_distinct, prog
             g_str, db = g
             db_name = db
             db = os.path.join(db_dir, db, db + ".sqlite")
-            schema = Schema(get_schema(db))
+            schema = get_cached_schema(db)
             try:
                 g_sql = get_sql(schema, g_str)
             except Exception as e:
@@ -627,8 +648,7 @@ def evaluate(golds, preds, db_dir, etype, kmaps, plug_value, keep_distinct, prog
                     }
 
             if etype in ["all", "exec"]:
-                exec_score = eval_exec_match(db=db, p_str=p_str, g_str=g_str, plug_value=plug_value,
-                                             keep_distinct=keep_distinct, progress_bar_for_each_datapoint=progress_bar_for_each_datapoint)
+                exec_score = next(exec_scores)
                 if exec_score:
                     scores[hardness]['exec'] += 1
                     scores[turn_id]['exec'] += 1
@@ -1,14 +1,18 @@
 import os
 import re
-import asyncio
 import sqlite3
+import pathlib
 import threading
+import multiprocessing as mp
 from typing import Tuple, Any, List, Set
-from itertools import product
-from collections import defaultdict
+from itertools import product, permutations
+from collections import defaultdict, OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 import tqdm
 import random
-from .parse import get_all_preds_for_execution, remove_distinct
+from .parse import get_pruned_preds_for_execution, remove_distinct
+from loguru import logger
 import time
 import pickle as pkl
 import subprocess
@@ -73,8 +77,8 @@ def get_constraint_permutation(tab1_sets_by_columns: List[Set], result2: List[Tu
     return product(*perm_constraints)
 
 
-# check whether two denotations are correct
-def result_eq(result1: List[Tuple], result2: List[Tuple], order_matters: bool) -> bool:
+# check whether two denotations are correct, by enumerating column permutations
+def result_eq_by_permutation(result1: List[Tuple], result2: List[Tuple], order_matters: bool) -> bool:
     if len(result1) == 0 and len(result2) == 0:
         return True
 
@@ -122,6 +126,84 @@ def result_eq(result1: List[Tuple], result2: List[Tuple], order_matters: bool) -
     return False
 
 
+# types whose values may compare equal to a value of another type (e.g. 1 == 1.0 == True)
+_NUMERIC_TYPES = (bool, int, float)
+
+
+# whether equal values in the denotations always have identical types
+# otherwise, the string-keyed row sorting of quick_rej can tell equal rows apart
+def has_consistent_types(result1: List[Tuple], result2: List[Tuple]) -> bool:
+    value_types = set(map(type, chain.from_iterable(chain(result1, result2))))
+    return len(value_types.intersection(_NUMERIC_TYPES)) <= 1
+
+
+# hash signature of a column, equal for two columns holding the same values (in the same order if it matters)
+# signatures of different columns may collide, so every candidate permutation is verified on the full rows
+def column_signature(column: Tuple, order_matters: bool) -> int:
+    if order_matters:
+        return hash(column)
+    return sum(map(hash, column))
+
+
+# bag of rows, compared as a plain dict (Counter.__eq__ iterates in Python)
+def count_rows(rows: List[Tuple]) -> dict:
+    return dict(Counter(rows))
+
+
+# check whether two denotations are correct
+def result_eq(result1: List[Tuple], result2: List[Tuple], order_matters: bool) -> bool:
+    if len(result1) == 0 and len(result2) == 0:
+        return True
+
+    # if length is not the same, then they are definitely different bag of rows
+    if len(result1) != len(result2):
+        return False
+
+    num_cols = len(result1[0])
+
+    # if the results do not have the same number of columns, they are different
+    if len(result2[0]) != num_cols:
+        return False
+
+    if not has_consistent_types(result1, result2):
+        return result_eq_by_permutation(result1, result2, order_matters)
+
+    # a column permutation can only map a column of result_1 to a column of result_2 with the same values,
+    # so we match columns by their signatures up front instead of enumerating all permutations
+    columns1, columns2 = list(zip(*result1)), list(zip(*result2))
+    signatures1 = [column_signature(column, order_matters) for column in columns1]
+    columns2_by_signature = defaultdict(list)
+    for col, column in enumerate(columns2):
+        columns2_by_signature[column_signature(column, order_matters)].append(col)
+    if Counter(signatures1) != Counter({signature: len(cols) for signature, cols in columns2_by_signature.items()}):
+        return False
+
+    # the bag of rows of result_1 is computed once and compared against each candidate permutation of result_2
+    rows1 = result1 if order_matters else count_rows(result1)
+
+    def eq_under(perm: Tuple) -> bool:
+        result2_perm = result2 if perm == tuple(range(num_cols)) else list(map(itemgetter(*perm), result2))
+        return rows1 == (result2_perm if order_matters else count_rows(result2_perm))
+
+    # columns of result_1 sharing a signature may be assigned to the matching columns of result_2 in any order
+    groups = defaultdict(list)
+    for col, signature in enumerate(signatures1):
+        groups[signature].append(col)
+    if all(len(cols) == 1 for cols in groups.values()):
+        # the column matching is unique, a single comparison decides
+        return eq_under(tuple(columns2_by_signature[signature][0] for signature in signatures1))
+
+    group_items = list(groups.items())
+    for assignment in product(*[permutations(columns2_by_signature[signature]) for signature, _ in group_items]):
+        perm = [0] * num_cols
+        for (_, cols1), cols2 in zip(group_items, assignment):
+            for col1, col2 in zip(cols1, cols2):
+                perm[col1] = col2
+        if eq_under(tuple(perm)):
+            return True
+    return False
+
+
 def replace_cur_year(query: str) -> str:
     return re.sub(
         "YEAR\s*\(\s*CURDATE\s*\(\s*\)\s*\)\s*", "2020", query, flags=re.IGNORECASE
@@ -142,29 +224,105 @@ def get_cursor_from_path(sqlite_path: str):
     return cursor
 
 
-async def exec_on_db_(sqlite_path: str, query: str) -> Tuple[str, Any]:
+# connections are reused per thread, keeping at most MAX_THREAD_CONNECTIONS open (least recently used are closed)
+MAX_THREAD_CONNECTIONS = 64
+SQLITE_PROGRESS_STEPS = 1000
+_thread_local = threading.local()
+
+
+def get_thread_connection(sqlite_path: str) -> sqlite3.Connection:
+    connections = getattr(_thread_local, "connections", None)
+    if connections is None:
+        connections = _thread_local.connections = OrderedDict()
+    if sqlite_path in connections:
+        connections.move_to_end(sqlite_path)
+        return connections[sqlite_path]
+    # opened read-only, such that predicted DML / DDL can never change the test-suite databases
+    connection = sqlite3.connect(f"{pathlib.Path(sqlite_path).resolve().as_uri()}?mode=ro", uri=True)
+    connection.text_factory = lambda b: b.decode(errors="ignore")
+    connections[sqlite_path] = connection
+    if len(connections) > MAX_THREAD_CONNECTIONS:
+        _, evicted = connections.popitem(last=False)
+        evicted.close()
+    return connection
+
+
+def exec_on_db(
+    sqlite_path: str, query: str, process_id: str = "", timeout: int = TIMEOUT
+) -> Tuple[str, Any]:
     query = replace_cur_year(query)
-    cursor = get_cursor_from_path(sqlite_path)
+    try:
+        connection = get_thread_connection(sqlite_path)
+    except sqlite3.Error as e:
+        # e.g., a missing database file, which is not created by the read-only connection
+        return "exception", e
+    # interrupt the query inside sqlite once the timeout has passed
+    deadline = time.monotonic() + timeout
+    connection.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+    cursor = connection.cursor()
     try:
         cursor.execute(query)
         result = cursor.fetchall()
-        cursor.close()
-        cursor.connection.close()
         return "result", result
+    except sqlite3.OperationalError as e:
+        if time.monotonic() > deadline:
+            return "exception", TimeoutError
+        return "exception", e
     except Exception as e:
-        cursor.close()
-        cursor.connection.close()
         return "exception", e
+    finally:
+        cursor.close()
+        connection.set_progress_handler(None, SQLITE_PROGRESS_STEPS)
+        # end any transaction left open by the query, invisible to the next queries on this connection
+        connection.rollback()
+
+
+# a thread pool per process, executing the gold query concurrently with the prediction
+_executor = None
+_executor_pid = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=1)
+        _executor_pid = os.getpid()
+    return _executor
 
-async def exec_on_db(
-    sqlite_path: str, query: str, process_id: str = "", timeout: int = TIMEOUT
-) -> Tuple[str, Any]:
-    try:
-        return await asyncio.wait_for(exec_on_db_(sqlite_path, query), timeout)
-    except asyncio.TimeoutError:
-        return ('exception', TimeoutError)
-    except Exception as e:
-        return ("exception", e)
+
+# gold denotations are shared across all candidate predictions (e.g. with plug_value) of the same database,
+# keyed on the size and mtime of the database file such that a changed file is executed again.
+# Failed executions are never cached, and the cache is cleared once an evaluation is done.
+GOLD_CACHE_SIZE = 256
+_gold_cache = OrderedDict()
+_gold_cache_lock = threading.Lock()
+
+
+def exec_gold_on_db(sqlite_path: str, g_str: str, timeout: float = TIMEOUT) -> Tuple[str, Any]:
+    stat = os.stat(sqlite_path)
+    key = (sqlite_path, stat.st_size, stat.st_mtime_ns, g_str)
+    with _gold_cache_lock:
+        if key in _gold_cache:
+            _gold_cache.move_to_end(key)
+            return _gold_cache[key]
+    result = exec_on_db(sqlite_path, g_str, timeout=timeout)
+    if result[0] == "result":
+        with _gold_cache_lock:
+            _gold_cache[key] = result
+            if len(_gold_cache) > GOLD_CACHE_SIZE:
+                _gold_cache.popitem(last=False)
+    return result
+
+
+def clear_gold_cache() -> None:
+    with _gold_cache_lock:
+        _gold_cache.clear()
+
+
+def exec_pair_on_db(sqlite_path: str, g_str: str, p_str: str, timeout: float = TIMEOUT) -> Tuple[Tuple[str, Any], Tuple[str, Any]]:
+    gold_future = get_executor().submit(exec_gold_on_db, sqlite_path, g_str, timeout)
+    pred_result = exec_on_db(sqlite_path, p_str, timeout=timeout)
+    return gold_future.result(), pred_result
 
 
 # postprocess the model predictions to avoid execution errors
@@ -174,14 +332,16 @@ def postprocess(query: str) -> str:
     return query
 
 
-# approximate whether p_str and g_str are semantically equivalent
-# db is the database path
-# we are going to evaluate whether they are equivalent in all the databases
-# that are in the same directory as db
-# 0 if denotationally equivalent
-# 1 otherwise
-# the meaning of each auxillary argument can be seen in the parser definition in evaluation.py
-def eval_exec_match(db: str, p_str: str, g_str: str, plug_value: bool, keep_distinct: bool, progress_bar_for_each_datapoint: bool) -> int:
+# find all databases (test-suite variants) in the same directory as db
+def get_db_paths(db: str) -> List[str]:
+    db_dir = os.path.dirname(db)
+    # [HW Fix] fixed referencing to sql-wal file.
+    # db_paths = [os.path.join(db_dir, basename) for basename in os.listdir(db_dir) if '.sqlite' in basename]
+    return [os.path.join(db_dir, basename) for basename in os.listdir(db_dir) if basename.endswith('.sqlite')]
+
+
+# post-process the pair and decide whether the order of rows matters
+def prepare_match(p_str: str, g_str: str, keep_distinct: bool) -> Tuple[str, str, bool]:
     # post-process the prediction.
     # e.g. removing spaces between ">" and "="
     p_str, g_str = postprocess(p_str), postprocess(g_str)
@@ -195,20 +355,57 @@ def eval_exec_match(db: str, p_str: str, g_str: str, plug_value: bool, keep_dist
     # order by might also be used to find the max/min instead of sorting,
     # but in that case the result mostly only contains one row and hence order_matters does not make a difference
     order_matters = 'order by' in g_str.lower()
+    return p_str, g_str, order_matters
+
+
+# 1 if pred has the same denotation as the gold on a single database, 0 otherwise
+def eval_exec_match_on_db(db_path: str, pred: str, g_str: str, order_matters: bool, timeout: float = TIMEOUT) -> int:
+    (g_flag, g_denotation), (p_flag, p_denotation) = exec_pair_on_db(db_path, g_str, pred, timeout)
+
+    # we should expect the gold to be succesfully executed on the database
+    assert g_flag != 'exception', 'gold query %s has error on database file %s' % (g_str, db_path)
+
+    # wrong if execution fails
+    if p_flag == 'exception':
+        return 0
+
+    # if denotations are not equivalent, the prediction must be wrong
+    if not result_eq(g_denotation, p_denotation, order_matters=order_matters):
+        return 0
+    return 1
+
+
+# approximate whether p_str and g_str are semantically equivalent
+# db is the database path
+# we are going to evaluate whether they are equivalent in all the databases
+# that are in the same directory as db
+# 0 if denotationally equivalent
+# 1 otherwise
+# the meaning of each auxillary argument can be seen in the parser definition in evaluation.py
+def eval_exec_match(db: str, p_str: str, g_str: str, plug_value: bool, keep_distinct: bool, progress_bar_for_each_datapoint: bool,
+                    plug_value_budget: int = None, timeout: float = TIMEOUT) -> int:
+    score, _, _ = eval_exec_match_with_counts(db, p_str, g_str, plug_value, keep_distinct, progress_bar_for_each_datapoint,
+                                              plug_value_budget, timeout)
+    return score
+
+
+# same as eval_exec_match, also returning the number of candidate predictions generated
+# and skipped by plugging gold values (both 0 without plug_value)
+def eval_exec_match_with_counts(db: str, p_str: str, g_str: str, plug_value: bool, keep_distinct: bool,
+                                progress_bar_for_each_datapoint: bool, plug_value_budget: int = None,
+                                timeout: float = TIMEOUT) -> Tuple[int, int, int]:
+    p_str, g_str, order_matters = prepare_match(p_str, g_str, keep_distinct)
 
     # find all databases in the same directory
-    db_dir = os.path.dirname(db)
-    
-    # [HW Fix] fixed referencing to sql-wal file.
-    # db_paths = [os.path.join(db_dir, basename) for basename in os.listdir(db_dir) if '.sqlite' in basename]
-    db_paths = [os.path.join(db_dir, basename) for basename in os.listdir(db_dir) if basename.endswith('.sqlite')]
+    db_paths = get_db_paths(db)
 
     preds = [p_str]
+    num_candidates, num_skipped = 0, 0
     # if plug in value (i.e. we do not consider value prediction correctness)
     # enumerate all ways to plug in values in the gold query to the model predictions
     # otherwise, we only evaluate the predicted query with its own value prediction
     if plug_value:
-        _, preds = get_all_preds_for_execution(g_str, p_str)
+        num_candidates, num_skipped, preds = get_pruned_preds_for_execution(g_str, p_str, plug_value_budget)
         # we did not add this line in our EMNLP work
         # this reduces "false negatives" when value is substituted
         preds = chain([p_str], preds)
@@ -224,25 +421,83 @@ def eval_exec_match(db: str, p_str: str, g_str: str, plug_value: bool, keep_dist
             ranger = db_paths
 
         for db_path in ranger:
-            g_flag, g_denotation = asyncio.run(exec_on_db(db_path, g_str))
-            p_flag, p_denotation = asyncio.run(exec_on_db(db_path, pred))
-
-            # we should expect the gold to be succesfully executed on the database
-            assert g_flag != 'exception', 'gold query %s has error on database file %s' % (g_str, db_path)
-
-            # wrong if execution fails
-            if p_flag == 'exception':
-                pred_passes = 0
-
-            # if denotations are not equivalent, the prediction must be wrong
-            elif not result_eq(g_denotation, p_denotation, order_matters=order_matters):
-                pred_passes = 0
+            pred_passes = eval_exec_match_on_db(db_path, pred, g_str, order_matters, timeout)
             if pred_passes == 0:
                 break
 
         # the model prediction has the same denotation as the gold for all databases
         if pred_passes == 1:
-            return 1
+            return 1, num_candidates, num_skipped
 
     # none of the predictions passed
-    return 0
\ No newline at end of file
+    return 0, num_candidates, num_skipped
+
+
+# flags of the samples with a failing unit, shared with the pool workers,
+# such that the remaining database variants of a failed sample are not executed
+_failed_samples = None
+
+
+def _init_failed_samples(failed_samples) -> None:
+    global _failed_samples
+    _failed_samples = failed_samples
+
+
+def _exec_match_unit(unit) -> Tuple[str, Any]:
+    owner, func, args = unit
+    if _failed_samples[owner]:
+        return "skipped", None
+    try:
+        res = func(*args)
+    except AssertionError as e:
+        return "exception", str(e)
+    if res == 0:
+        _failed_samples[owner] = 1
+    return "result", res
+
+
+# evaluate the execution match of many samples with a process pool, in the order of the samples
+# without plug_value, each (sample, database variant) pair is a separate unit of work
+def eval_exec_match_parallel(dbs: List[str], p_strs: List[str], g_strs: List[str], plug_value: bool,
+                             keep_distinct: bool, num_processes: int = 1, plug_value_budget: int = None,
+                             timeout: float = TIMEOUT) -> List[int]:
+    units = []
+    for i, (db, p_str, g_str) in enumerate(zip(dbs, p_strs, g_strs)):
+        if plug_value:
+            units.append((i, eval_exec_match_with_counts,
+                          (db, p_str, g_str, plug_value, keep_distinct, False, plug_value_budget, timeout)))
+        else:
+            p_str, g_str, order_matters = prepare_match(p_str, g_str, keep_distinct)
+            for db_path in get_db_paths(db):
+                units.append((i, eval_exec_match_on_db, (db_path, p_str, g_str, order_matters, timeout)))
+
+    if num_processes > 1 and len(units) > 1:
+        chunksize = max(1, len(units) // (num_processes * 4))
+        failed_samples = mp.Array("b", len(dbs), lock=False)
+        with mp.Pool(processes=num_processes, initializer=_init_failed_samples, initargs=(failed_samples,)) as pool:
+            unit_results = list(tqdm.tqdm(pool.imap(_exec_match_unit, units, chunksize=chunksize), total=len(units)))
+    else:
+        _init_failed_samples(bytearray(len(dbs)))
+        unit_results = [_exec_match_unit(unit) for unit in tqdm.tqdm(units)]
+    _init_failed_samples(None)
+
+    if plug_value:
+        num_candidates = sum(res[1] for flag, res in unit_results if flag == "result")
+        num_skipped = sum(res[2] for flag, res in unit_results if flag == "result")
+        unit_results = [(flag, res[0] if flag == "result" else res) for flag, res in unit_results]
+        logger.info(f"Plugging gold values: {num_candidates} candidate predictions generated, {num_skipped} skipped "
+                    f"by column pruning and the budget of {plug_value_budget} per sample.")
+
+    # a sample passes iff all its units pass, the first failing unit (in database order) decides,
+    # units after a failure may have been skipped
+    scores = [1] * len(dbs)
+    decided = [False] * len(dbs)
+    for (owner, _, _), (flag, res) in zip(units, unit_results):
+        if decided[owner] or flag == "skipped":
+            continue
+        if flag == "exception":
+            raise AssertionError(res)
+        if res == 0:
+            scores[owner] = 0
+            decided[owner] = True
+    return scores
@@ -136,6 +136,74 @@ def get_all_preds_for_execution(gold: str, pred: str) -> Tuple[int, Iterator[str
     return num_alternatives, plugin_all_permutations(pred_query_value_replaced, gold_values)
 
 
+COMPARISON_OPS = {'=', '>', '<', '>=', '<=', '!=', '<>', 'like'}
+
+
+# the column each value slot of the predicted query is compared with (None if unknown)
+def get_slot_columns(query_value_replaced: List[str]) -> List[Union[str, None]]:
+    slot = VALUE_NUM_SYMBOL.lower()
+    slot_columns = []
+    for idx, tok in enumerate(query_value_replaced):
+        if tok != slot:
+            continue
+        col_idx = None
+        if idx >= 2 and query_value_replaced[idx - 1] in COMPARISON_OPS | {'between'}:
+            col_idx = idx - 2
+        elif idx >= 4 and query_value_replaced[idx - 1] == 'and' and query_value_replaced[idx - 3] == 'between':
+            col_idx = idx - 4
+        col = query_value_replaced[col_idx] if col_idx is not None else None
+        slot_columns.append(col.split('.')[-1].upper() if col is not None and col != slot else None)
+    return slot_columns
+
+
+# candidate gold values for each value slot of the predicted query
+# a slot compared with a column also compared in the gold query only takes the gold values of that column,
+# and values which are the same literal up to quoting are only tried once
+def get_slot_candidates(gold: str, pred_query_value_replaced: List[str], gold_values: Set[str]) -> List[List[str]]:
+    gold_values = sorted(gold_values)
+    values_by_column = {}
+    for (_, col), val in extract_typed_value_in_comparison_from_query(gold):
+        values_by_column.setdefault(col, set()).add(process_str_value(val))
+
+    def dedup(values):
+        seen, unique = set(), []
+        for v in values:
+            key = (v[:1] in QUOTE_CHARS, process_str_value(v))
+            if key not in seen:
+                seen.add(key)
+                unique.append(v)
+        return unique
+
+    slot_candidates = []
+    for col in get_slot_columns(pred_query_value_replaced):
+        candidates = gold_values
+        if col in values_by_column:
+            typed = [v for v in gold_values if process_str_value(v) in values_by_column[col]]
+            candidates = typed if typed else gold_values
+        slot_candidates.append(dedup(candidates))
+    return slot_candidates
+
+
+# like get_all_preds_for_execution, with the candidates pruned by column compatibility and capped at budget
+# return 1) number of candidates to execute, 2) number of candidates skipped and 3) an iterator of predictions
+def get_pruned_preds_for_execution(gold: str, pred: str, budget: Union[int, None] = None) -> Tuple[int, int, Iterator[str]]:
+    _, gold_values = extract_query_values(gold)
+    pred_query_value_replaced, _ = extract_query_values(pred)
+    num_slots = len([v for v in pred_query_value_replaced if v == VALUE_NUM_SYMBOL.lower()])
+    num_alternatives = len(gold_values) ** num_slots
+    try:
+        slot_candidates = get_slot_candidates(gold, pred_query_value_replaced, gold_values)
+    except Exception:
+        # fall back to every gold value for every slot if the comparisons cannot be analyzed
+        slot_candidates = [sorted(gold_values) for _ in range(num_slots)]
+    num_pruned = 1
+    for candidates in slot_candidates:
+        num_pruned *= len(candidates)
+    num_candidates = num_pruned if budget is None else min(num_pruned, budget)
+    preds = (plugin(pred_query_value_replaced, list(values)) for values in itertools.product(*slot_candidates))
+    return num_candidates, num_alternatives - num_candidates, itertools.islice(preds, num_candidates)
+
+
 def remove_distinct(s):
     toks = [t.value for t in list(sqlparse.parse(s)[0].flatten())]
     return ''.join([t for t in toks if t.lower() != 'distinct'])
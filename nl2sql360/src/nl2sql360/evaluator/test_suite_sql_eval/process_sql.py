@@ -24,6 +24,7 @@
 # }
 ################################
 
+import os
 import json
 import sqlite3
 from nltk import word_tokenize
@@ -96,10 +97,36 @@ def get_schema(db):
     for table in tables:
         cursor.execute("PRAGMA table_info(`{}`)".format(table))
         schema[table] = [str(col[1].lower()) for col in cursor.fetchall()]
+    conn.close()
 
     return schema
 
 
+# db path -> (mtime, Schema), filled before forking worker processes such that they share it
+_schema_registry = {}
+
+
+def get_cached_schema(db):
+    """
+    Get database's Schema, reflected once per database and invalidated when the file changes
+    :param db: database path
+    :return: Schema
+    """
+    if not os.path.isfile(db):
+        return Schema(get_schema(db))
+    mtime = os.stat(db).st_mtime_ns
+    entry = _schema_registry.get(db)
+    if entry is None or entry[0] != mtime:
+        entry = (mtime, Schema(get_schema(db)))
+        _schema_registry[db] = entry
+    return entry[1]
+
+
+def prewarm_schemas(dbs):
+    for db in set(dbs):
+        get_cached_schema(db)
+
+
 def get_schema_from_json(fpath):
     with open(fpath) as f:
         data = json.load(f)
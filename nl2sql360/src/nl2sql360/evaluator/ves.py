@@ -1,4 +1,5 @@
 from .bird_eval.bird_ves import run_sqls_parallel, sort_results
+from .bird_eval.bird_ex import calculate_ex
 import os
 import math
 from loguru import logger
@@ -14,6 +15,13 @@ class VesEvaluator:
         self.db_name = kwds.get("db_name", None)
         self.user = kwds.get("db_user", None)
         self.password = kwds.get("db_password", None)
+        self.iterate_num = kwds.get("iterate_num", 100)
+        self.min_iterate_num = kwds.get("min_iterate_num", None)
+        self.target_rel_error = kwds.get("target_rel_error", None)
+        self.timing_statistic = kwds.get("timing_statistic", "median")
+        self.warmup = kwds.get("warmup", 1)
+        self.interleave = kwds.get("interleave", True)
+        self.pin_cpu = kwds.get("pin_cpu", False)
         
     
     def evaluate(self, gold_sqls, pred_sqls, db_ids, db_dir, **kwds):
@@ -22,6 +30,10 @@ class VesEvaluator:
         exec_acc_list = kwds.get("exec_acc_list", None)
         if self.reuse_ex and exec_acc_list is None:
             logger.warning("VES evaluator is set to reuse the EX result, but it has not been passed in.")
+        exec_cache = kwds.get("exec_cache", None)
+        if exec_acc_list is None and exec_cache is not None:
+            exec_acc_list = [exec_cache.compute(predicted_sql, ground_truth, db_place, calculate_ex)
+                             for (predicted_sql, ground_truth), db_place in zip(query_pairs, db_places)]
         ves_result = run_sqls_parallel(
             sqls=query_pairs,
             db_places=db_places,
@@ -29,6 +41,13 @@ class VesEvaluator:
             meta_time_out=kwds.get("timeout", 30),
             exec_acc_list=exec_acc_list,
             sql_dialect=self.sql_dialect,
+            iterate_num=self.iterate_num,
+            min_iterate_num=self.min_iterate_num,
+            target_rel_error=self.target_rel_error,
+            statistic=self.timing_statistic,
+            warmup=self.warmup,
+            interleave=self.interleave,
+            pin_cpu=self.pin_cpu,
             host=self.db_host,
             user=self.user,
             password=self.password,
@@ -36,10 +55,15 @@ class VesEvaluator:
             port=self.db_port
         )
         ves_result = sort_results(ves_result)
+        ves_ci = [res['rel_error'] if res['rel_error'] is not None and math.isfinite(res['rel_error']) else None
+                  for res in ves_result]
+        ves_mad = [res['mad'] for res in ves_result]
         ves_result = [math.sqrt(res['time_ratio']) for res in ves_result]
         return {
-            "ves": ves_result
+            "ves": ves_result,
+            "ves_ci": ves_ci,
+            "ves_mad": ves_mad
         }
     
     def get_eval_metrics(self):
-        return ["ves"]
+        return ["ves", "ves_ci", "ves_mad"]
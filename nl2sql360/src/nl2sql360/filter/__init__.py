@@ -1,4 +1,4 @@
-from .filter import Operator, Field, Filter, Scenario, parse_filter, parse_scenario, serialize_filter, serialize_scenario
+from .filter import Operator, Field, Filter, Scenario, parse_filter, parse_scenario, serialize_filter, serialize_scenario, compile_filter, compile_scenario
 
 
 __all__ = [
@@ -9,5 +9,7 @@ __all__ = [
     "parse_filter",
     "parse_scenario",
     "serialize_filter",
-    "serialize_scenario"
+    "serialize_scenario",
+    "compile_filter",
+    "compile_scenario"
 ]
\ No newline at end of file
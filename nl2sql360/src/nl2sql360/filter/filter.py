@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Dict
 import re
 
 
@@ -87,3 +87,28 @@ def serialize_filter(filter: Filter) -> str:
 
 def serialize_scenario(scenario: Scenario) -> str:
     return " AND ".join([serialize_filter(filter) for filter in scenario.filters])
+
+
+# NumPy is imported on first compilation, as parsing filters (e.g., CLI arguments) does not need it
+_OPERATOR_UFUNCS = {
+    Operator.GT: "greater",
+    Operator.LT: "less",
+    Operator.EQ: "equal"
+}
+
+
+def compile_filter(filter: Filter, features: Dict[str, "np.ndarray"]) -> "np.ndarray":
+    r"""
+    Boolean mask of a filter over columnar SQL features (`count_*` arrays, NaN for NULL which never matches).
+    """
+    import numpy as np
+    with np.errstate(invalid="ignore"):
+        return getattr(np, _OPERATOR_UFUNCS[filter.operator])(features[map_field_to_database_col(filter.field)], filter.value)
+
+
+def compile_scenario(scenario: Scenario, features: Dict[str, "np.ndarray"]) -> "np.ndarray":
+    import numpy as np
+    if not scenario.filters:
+        # a scenario without filters selects every sample, as `WHERE 1 = 1`
+        return np.ones(len(next(iter(features.values()))), dtype=bool)
+    return np.logical_and.reduce([compile_filter(filter, features) for filter in scenario.filters])
@@ -1,6 +1,9 @@
-from .sql_parser import SQLParser
+from .sql_parser import SQLParser, SQLFeatures, extract_sql_features, iter_sql_features
 
 
 __all__ = [
-    "SQLParser"
-]
\ No newline at end of file
+    "SQLParser",
+    "SQLFeatures",
+    "extract_sql_features",
+    "iter_sql_features"
+]
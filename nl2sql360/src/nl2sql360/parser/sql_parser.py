@@ -1,92 +1,209 @@
+import multiprocessing as mp
+from functools import lru_cache, partial
+from typing import NamedTuple, Dict, List, Tuple, Optional, Sequence, Iterator
 from sqlglot import parse_one, exp
 
 
+class SQLFeatures(NamedTuple):
+    r"""
+    Compact record of the SQL keyword counts extracted from one SQL.
+    """
+    count_query_fields: int
+    count_group_by: int
+    count_order_by: int
+    count_limit: int
+    count_join: int
+    count_predicate: int
+    count_aggregation: int
+    count_scalar_function: int
+    count_subquery: int
+    count_set_operation: int
+    count_math_compute: int
+    count_logical_connector: int
+    count_distinct: int
+    count_like: int
+    count_control_flow: int
+    count_window: int
+
+    def to_dict(self) -> Dict[str, int]:
+        return self._asdict()
+
+
 class SQLParser:
-    
+
     _SET_KEYWORDS = (exp.Union, exp.Except, exp.Intersect)
-    
+
     _SCALAR_KEYWORDS = (exp.Abs, exp.Length, exp.Cast, exp.Round, exp.Upper, exp.Lower, exp.Rand)
     _SCALAR_KEYWORDS_ANONYMOUS_STR = ("STRFTIME", "JULIADAY", "NOW", "INSTR", "SUBSTR")
-    
+
     _MATH_COMPUTE_KEYWORDS = (exp.Add, exp.Sub, exp.Mul, exp.Div, exp.Mod)
-    
+
     _LOGICAL_CONNECTOR_KEYWORDS = (exp.And, exp.Or)
-    
+
     _CONTROL_FLOW_KEYWORDS = (exp.Case)
     _CONTROL_FLOW_KEYWORDS_ANONYMOUS_STR = ("IIF")
-    
+
+    # feature -> node types counted by it, in one walk of the AST
+    _NODE_FEATURES = (
+        ("count_group_by", exp.Group),
+        ("count_order_by", exp.Order),
+        ("count_limit", exp.Limit),
+        ("count_join", exp.Join),
+        ("count_predicate", exp.Predicate),
+        ("count_aggregation", exp.AggFunc),
+        ("count_scalar_function", _SCALAR_KEYWORDS),
+        ("count_subquery", exp.Subquery),
+        ("count_set_operation", _SET_KEYWORDS),
+        ("count_math_compute", _MATH_COMPUTE_KEYWORDS),
+        ("count_logical_connector", _LOGICAL_CONNECTOR_KEYWORDS),
+        ("count_distinct", exp.Distinct),
+        ("count_like", exp.Like),
+        ("count_control_flow", _CONTROL_FLOW_KEYWORDS),
+        ("count_window", exp.Window),
+    )
+
     def __init__(self, sql, dialect="sqlite"):
-        self.ast = parse_one(sql, dialect=dialect)
-    
+        self.sql = sql
+        self.dialect = dialect
+        self._ast = None
+
     @property
-    def count_query_fields(self):
-        _ast = self.ast
-        while isinstance(_ast, self._SET_KEYWORDS):
+    def ast(self):
+        if self._ast is None:
+            self._ast = parse_one(self.sql, dialect=self.dialect)
+        return self._ast
+
+    @property
+    def features(self) -> "SQLFeatures":
+        return extract_sql_features(self.sql, self.dialect)
+
+    @classmethod
+    def _extract_features(cls, ast) -> "SQLFeatures":
+        _ast = ast
+        while isinstance(_ast, cls._SET_KEYWORDS):
             _ast = _ast.this
         assert isinstance(_ast, exp.Select)
-        return len(_ast.expressions)
-    
+
+        counts = dict.fromkeys((feature for feature, _ in cls._NODE_FEATURES), 0)
+        for node in ast.walk():
+            for feature, node_types in cls._NODE_FEATURES:
+                if isinstance(node, node_types):
+                    counts[feature] += 1
+            if isinstance(node, exp.Anonymous):
+                name = node.this.upper()
+                if name in cls._SCALAR_KEYWORDS_ANONYMOUS_STR:
+                    counts["count_scalar_function"] += 1
+                if name in cls._CONTROL_FLOW_KEYWORDS_ANONYMOUS_STR:
+                    counts["count_control_flow"] += 1
+        return SQLFeatures(count_query_fields=len(_ast.expressions), **counts)
+
+    @property
+    def count_query_fields(self):
+        return self.features.count_query_fields
+
     @property
     def count_group_by(self):
-        return len(list(self.ast.find_all(exp.Group)))
-    
+        return self.features.count_group_by
+
     @property
     def count_order_by(self):
-        return len(list(self.ast.find_all(exp.Order)))
-    
+        return self.features.count_order_by
+
     @property
     def count_limit(self):
-        return len(list(self.ast.find_all(exp.Limit)))
-    
+        return self.features.count_limit
+
     @property
     def count_join(self):
-        return len(list(self.ast.find_all(exp.Join)))
-    
+        return self.features.count_join
+
     @property
     def count_predicate(self):
-        return len(list(self.ast.find_all(exp.Predicate)))
-    
+        return self.features.count_predicate
+
     @property
     def count_aggregation(self):
-        return len(list(self.ast.find_all(exp.AggFunc)))
-    
+        return self.features.count_aggregation
+
     @property
     def count_scalar_function(self):
-        scalar_nodes = list(self.ast.find_all(self._SCALAR_KEYWORDS))
-        scalar_nodes.extend([node for node in self.ast.find_all(exp.Anonymous) if node.this.upper() in self._SCALAR_KEYWORDS_ANONYMOUS_STR])
-        return len(scalar_nodes)
-    
+        return self.features.count_scalar_function
+
     @property
     def count_subquery(self):
-        return len(list(self.ast.find_all(exp.Subquery)))
-    
+        return self.features.count_subquery
+
     @property
     def count_set_operation(self):
-        return len(list(self.ast.find_all(self._SET_KEYWORDS)))
-    
+        return self.features.count_set_operation
+
     @property
     def count_math_compute(self):
-        return len(list(self.ast.find_all(self._MATH_COMPUTE_KEYWORDS)))
-    
+        return self.features.count_math_compute
+
     @property
     def count_logical_connector(self):
-        return len(list(self.ast.find_all(self._LOGICAL_CONNECTOR_KEYWORDS)))
-    
+        return self.features.count_logical_connector
+
     @property
     def count_distinct(self):
-        return len(list(self.ast.find_all(exp.Distinct)))
+        return self.features.count_distinct
 
     @property
     def count_like(self):
-        return len(list(self.ast.find_all(exp.Like)))
-    
+        return self.features.count_like
+
     @property
     def count_control_flow(self):
-        control_flow_nodes = list(self.ast.find_all(self._CONTROL_FLOW_KEYWORDS))
-        control_flow_nodes.extend([node for node in self.ast.find_all(exp.Anonymous) if node.this.upper() in self._CONTROL_FLOW_KEYWORDS_ANONYMOUS_STR])
-        return len(control_flow_nodes)
-    
+        return self.features.count_control_flow
+
     @property
     def count_window(self):
-        return len(list(self.ast.find_all(exp.Window)))
-    
\ No newline at end of file
+        return self.features.count_window
+
+
+@lru_cache(maxsize=65536)
+def _extract_cached_sql_features(sql: str, dialect: str) -> "SQLFeatures":
+    return SQLParser._extract_features(parse_one(sql, dialect=dialect))
+
+
+def extract_sql_features(sql: str, dialect: str = "sqlite") -> "SQLFeatures":
+    r"""
+    All keyword counts of a SQL in one walk of its AST, memorized by (SQL, dialect).
+
+    The SQL text is parsed as is, as collapsing its whitespace would let a `--` comment swallow the rest of the query.
+    """
+    return _extract_cached_sql_features(sql, dialect)
+
+
+def _extract_sql_features_chunk(sqls: List[str], dialect: str) -> List[Tuple[Optional[Dict[str, int]], Optional[str]]]:
+    results = []
+    for sql in sqls:
+        try:
+            results.append((extract_sql_features(sql, dialect).to_dict(), None))
+        except Exception as e:
+            results.append((None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def iter_sql_features(
+    sqls: Sequence[str],
+    dialect: str = "sqlite",
+    num_processes: int = 1,
+    chunk_size: int = 1000
+) -> Iterator[Tuple[Optional[Dict[str, int]], Optional[str]]]:
+    r"""
+    Yield `(features, error)` of each SQL in order, parsing chunks of SQLs in a process pool.
+    
+    A SQL which fails to parse (or is not a SELECT statement) yields `None` features and its error message,
+    instead of aborting the remaining SQLs.
+    """
+    chunks = [sqls[start: start + chunk_size] for start in range(0, len(sqls), chunk_size)]
+    num_processes = min(num_processes, len(chunks))
+    if num_processes <= 1:
+        for chunk in chunks:
+            yield from _extract_sql_features_chunk(chunk, dialect)
+        return
+    with mp.Pool(processes=num_processes) as pool:
+        for results in pool.imap(partial(_extract_sql_features_chunk, dialect=dialect), chunks):
+            yield from results